@@ -1,8 +1,22 @@
+import importlib
+from typing import Any
+
 from ._version import __version__
 from .pipeline.run import run_pipeline
-from .plot.register.diagnostics import RegistrationViewer
-from .plot.results_viewer.base import Viewer
 from .setup.notebook import Notebook
 from .setup.notebook_page import NotebookPage
 
+# The viewers import napari and Qt, so their modules are only imported when first accessed.
+_lazy_imports = {
+    "RegistrationViewer": ".plot.register.diagnostics",
+    "Viewer": ".plot.results_viewer.base",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_imports:
+        return getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = ["__version__", "run_pipeline", "Viewer", "RegistrationViewer", "Notebook", "NotebookPage"]
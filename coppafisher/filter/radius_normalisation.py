@@ -1,3 +1,5 @@
+from typing import Optional
+
 import numpy as np
 import scipy
 
@@ -22,7 +24,10 @@ def validate_radius_normalisation(radius_normalisation: np.ndarray[np.floating],
 
 
 def radius_normalise_image(
-    image: np.ndarray[np.floating], radius_normalisation: np.ndarray[np.floating]
+    image: np.ndarray[np.floating],
+    radius_normalisation: np.ndarray[np.floating],
+    out: Optional[np.ndarray[np.floating]] = None,
+    image_normalisations: Optional[np.ndarray[np.floating]] = None,
 ) -> np.ndarray[np.floating]:
     """
     Radius normalise the image.
@@ -34,9 +39,15 @@ def radius_normalise_image(
         image (`(im_y x im_x x im_z) ndarray[float]`): the tile image. `im_y == im_x`.
         radius_normalisation (`(max_tile_radius) ndarray[float]`): radius_normalisation[r] is the value to divide by for a pixel at radius `r` from the
             centre of the tile image.
+        out (`(im_y x im_x x im_z) ndarray[float]`, optional): array to write the normalised image into. Can be the
+            image itself to normalise in place. Default: a new array.
+        image_normalisations (`(im_y x im_x) ndarray[float]`, optional): the per pixel normalisations given by
+            `get_image_normalisations` for this radius normalisation. Pass them in when normalising many images with
+            the same radius normalisation so they are only computed once. Default: computed from
+            `radius_normalisation`.
 
     Returns:
-        (`(im_y x im_x x im_z) ndarray[float]`): normalised_image. The radius-normalised image.
+        (`(im_y x im_x x im_z) ndarray[float]`): normalised_image. The radius-normalised image, `out` if given.
 
     Notes:
         - If a pixel's radius is a non-integer, linearly interpolation is applied to find the value to divide by.
@@ -48,19 +59,45 @@ def radius_normalise_image(
     assert type(radius_normalisation) is np.ndarray
     assert radius_normalisation.ndim == 1
     assert radius_normalisation.size == np.ceil(np.sqrt(2 * (0.5 * (image.shape[0] - 1)) ** 2)).astype(int) + 1
+    if out is None:
+        out = np.empty_like(image)
+    assert type(out) is np.ndarray
+    assert out.shape == image.shape
+    assert out.dtype == image.dtype
+
+    if image_normalisations is None:
+        image_normalisations = get_image_normalisations(radius_normalisation.astype(image.dtype), image.shape)
+    assert type(image_normalisations) is np.ndarray
+    assert image_normalisations.shape == image.shape[:2]
+
+    np.divide(image, image_normalisations[:, :, np.newaxis], out=out)
+
+    return out
+
+
+def get_image_normalisations(
+    radius_normalisation: np.ndarray[np.floating], image_shape: tuple[int, ...]
+) -> np.ndarray[np.floating]:
+    """
+    Get the value to divide by at every y, x pixel position for the given radius normalisation.
 
-    radius_normalisation = radius_normalisation.astype(image.dtype)
+    Args:
+        radius_normalisation (`(max_tile_radius) ndarray[float]`): radius normalisation, in the image's dtype.
+        image_shape (tuple of ints): the image shape, starting with `im_y, im_x`.
 
-    image_centre = np.array(image.shape, image.dtype) - 1
+    Returns:
+        (`(im_y x im_x) ndarray[float]`): image_normalisations. The read-only normalisation for each y, x position.
+    """
+    image_centre = np.array(image_shape, radius_normalisation.dtype) - 1
     image_centre /= 2
 
     image_yx_positions = np.meshgrid(
-        np.linspace(0, image.shape[0] - 1, image.shape[0]),
-        np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(0, image_shape[0] - 1, image_shape[0]),
+        np.linspace(0, image_shape[1] - 1, image_shape[1]),
         indexing="ij",
     )
     # Has shape (2, im_y, im_x).
-    image_yx_positions = np.array(image_yx_positions, image.dtype)
+    image_yx_positions = np.array(image_yx_positions, radius_normalisation.dtype)
     image_yx_positions -= image_centre[:2, np.newaxis, np.newaxis]
 
     # The radius of each image position.
@@ -72,10 +109,8 @@ def radius_normalise_image(
         np.arange(radius_normalisation.size), radius_normalisation, k=1
     )
     image_normalisations = linear_spline(image_radii)
-    image_normalisations = image_normalisations.reshape(image.shape[:2], order="F")
+    image_normalisations = image_normalisations.reshape(image_shape[:2], order="F")
     del image_radii
+    image_normalisations.flags.writeable = False
 
-    output = image.copy()
-    output /= image_normalisations[:, :, np.newaxis]
-
-    return output
+    return image_normalisations
@@ -58,3 +58,18 @@ def test_radius_normalise_image() -> None:
     assert np.allclose(image[0, :], output[0, :])
     assert np.allclose(image[-1, :], output[-1, :])
     assert np.allclose(image[:, -1], output[:, -1])
+
+    # Passing in precomputed normalisations gives the same result.
+    image_normalisations = radius_normalisation.get_image_normalisations(radius_norm.astype(image.dtype), image.shape)
+    assert image_normalisations.shape == image.shape[:2]
+    assert not image_normalisations.flags.writeable
+    output_precomputed = radius_normalisation.radius_normalise_image(
+        image, radius_norm, image_normalisations=image_normalisations
+    )
+    assert np.array_equal(output_precomputed, output)
+
+    # Normalising in place gives the same result.
+    image_in_place = image.copy()
+    output_in_place = radius_normalisation.radius_normalise_image(image_in_place, radius_norm, out=image_in_place)
+    assert output_in_place is image_in_place
+    assert np.array_equal(image_in_place, output)
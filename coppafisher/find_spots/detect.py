@@ -38,9 +38,11 @@ def detect_spots(
         assert radius_xy > 0
         assert radius_z > 0
 
+    # The y, x, and z index arrays of the image local maxima, used directly to gather their intensities.
+    maxima_indices = np.array(image > intensity_thresh).nonzero()
     # (n_spots x 3) coordinate positions of the image local maxima.
-    maxima_locations = np.array(np.array(image > intensity_thresh).nonzero()).T.astype(np.int16)
-    maxima_intensities = np.array(image[tuple(maxima_locations.T)])
+    maxima_locations = np.stack(maxima_indices, axis=1).astype(np.int16)
+    maxima_intensities = np.array(image[maxima_indices])
     if remove_duplicates:
         maxima_locations_norm = maxima_locations.astype(np.float32)
         maxima_locations_norm[:, 2] *= radius_xy / radius_z
@@ -31,8 +31,9 @@ def score_pixel_score_image(
 
     device = system.get_device(force_cpu)
 
-    score_image = pixel_score_image.detach().clone().to(device=device)
-    spot_shape_kernel = mean_spot.detach().clone().to(dtype=score_image.dtype, device=device)
+    # The convolution does not modify its input, so the pixel score image is only copied when moved to another device.
+    score_image = pixel_score_image.detach().to(device=device)
+    spot_shape_kernel = mean_spot.detach().to(dtype=score_image.dtype, device=device, copy=True)
     spot_shape_kernel /= spot_shape_kernel.sum()
 
     spot_shape_kernel = spot_shape_kernel[np.newaxis, np.newaxis]
@@ -69,12 +70,12 @@ def boost_z_edge_spot_scores(spot_score_image: torch.Tensor, mean_spot: torch.Te
 
     # FIXME: This algorithm assumes that the mean spot is symmetrical along the middle z plane. Can be made more robust.
     z_edge_size = min(mean_spot.shape[2] // 2, spot_score_image.shape[3])
-    z_edge_weightings = torch.zeros((1, 1, 1, z_edge_size), dtype=torch.float32)
-    for z_edge in range(z_edge_size):
-        z_edge_weightings[0, 0, 0, z_edge] = torch.reciprocal(1 - spot_shape_kernel[:, :, : (z_edge + 1)].sum())
-        z_edge_weightings[torch.isinf(z_edge_weightings)] = 0
-        if z_edge > 0:
-            assert (z_edge_weightings[..., z_edge] >= z_edge_weightings[..., z_edge - 1]).all()
+    # The kernel fraction cut off at each z edge distance is a cumulative sum over the kernel's z planes.
+    z_plane_sums = spot_shape_kernel[:, :, :z_edge_size].sum((0, 1))
+    z_edge_weightings = torch.reciprocal(1 - torch.cumsum(z_plane_sums, 0)).to(torch.float32)
+    z_edge_weightings[torch.isinf(z_edge_weightings)] = 0
+    assert (z_edge_weightings[1:] >= z_edge_weightings[:-1]).all()
+    z_edge_weightings = z_edge_weightings.reshape((1, 1, 1, z_edge_size))
 
     if z_edge_size > 0:
         spot_score_image_boosted[:, :, :, :z_edge_size] *= torch.flip(z_edge_weightings, [3])
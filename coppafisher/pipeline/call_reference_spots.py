@@ -87,11 +87,12 @@ def call_reference_spots(
     # 1. Normalise spot colours and remove background as constant offset across different rounds of the same channel
     colour_norm_factor_initial = np.zeros((n_tiles, n_rounds, n_channels_use), np.float32)
     for t in use_tiles:
+        is_tile_t = spot_tile == t
         # Dividing by zero can happen when bad_trc is set. This warning is ignored. Infinities are set to ones.
         with np.errstate(divide="ignore", invalid="ignore"):
-            colour_norm_factor_initial[t] = 1 / (np.percentile(spot_colours[spot_tile == t], 95, axis=0))
-        colour_norm_factor_initial[colour_norm_factor_initial == np.inf] = 1
-        spot_colours[spot_tile == t] *= colour_norm_factor_initial[t]
+            colour_norm_factor_initial[t] = 1 / (np.percentile(spot_colours[is_tile_t], 95, axis=0))
+        colour_norm_factor_initial[t][colour_norm_factor_initial[t] == np.inf] = 1
+        spot_colours[is_tile_t] *= colour_norm_factor_initial[t]
 
     if config["background_subtract"]:
         # Remove background as constant offset across different rounds of the same channel
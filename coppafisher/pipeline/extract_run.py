@@ -79,6 +79,7 @@ def run_extract(config: ConfigSection, nbp_file: NotebookPage, nbp_basic: Notebo
     )
     indices_t = indexing.unique(indices, axis=0)
     indices_r = indexing.unique(indices, axis=1)
+    indices_channels = indexing.group_channels(indices)
     with tqdm(
         total=len(indices_t) * len(indices_r),
         desc=f"Extracting raw {nbp_file.raw_extension} files",
@@ -87,7 +88,7 @@ def run_extract(config: ConfigSection, nbp_file: NotebookPage, nbp_basic: Notebo
             for _, r, _ in indices_r:
                 pbar.set_postfix({"tile": t, "round": r})
 
-                channels = list(indexing.find_channels_for(indices, tile=t, round=r))
+                channels = list(indices_channels.get((t, r), tuple()))
                 file_paths = [nbp_file.tile_unfiltered[t][r][c] for c in channels]
                 files_exist = [zarray.image_exists(file_path) for file_path in file_paths]
 
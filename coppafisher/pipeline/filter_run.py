@@ -142,6 +142,20 @@ def run_filter(
     )
     nbp_debug.psf = psf
 
+    # Every image of a channel uses the same per pixel radius normalisations, so they are computed once per channel.
+    # They are only kept while filtering.
+    image_normalisations: dict[int, np.ndarray] = dict()
+    image_shape = (nbp_basic.tile_sz, nbp_basic.tile_sz)
+    if channel_radius_norm is not None:
+        for i, c in enumerate(nbp_basic.use_channels):
+            image_normalisations[c] = radius_normalisation.get_image_normalisations(
+                channel_radius_norm[i].astype(np.float64), image_shape
+            )
+    if dapi_radius_norm is not None and nbp_basic.dapi_channel not in image_normalisations:
+        image_normalisations[nbp_basic.dapi_channel] = radius_normalisation.get_image_normalisations(
+            dapi_radius_norm.astype(np.float64), image_shape
+        )
+
     batch_size: int | None = config["num_cores"]
     if batch_size is None:
         batch_size = max(1, maths.floor(system.get_available_memory() / 27))
@@ -170,12 +184,18 @@ def run_filter(
                 image = zarr.open_array(raw_store)[:]
             image = image.astype(np.float64)
 
+            # The image is already a private float64 copy, so it is normalised in place.
             if channel_radius_norm is not None and c in nbp_basic.use_channels:
-                image = radius_normalisation.radius_normalise_image(
-                    image, channel_radius_norm[nbp_basic.use_channels.index(c)]
+                radius_normalisation.radius_normalise_image(
+                    image,
+                    channel_radius_norm[nbp_basic.use_channels.index(c)],
+                    out=image,
+                    image_normalisations=image_normalisations[c],
                 )
             elif dapi_radius_norm is not None and c == nbp_basic.dapi_channel:
-                image = radius_normalisation.radius_normalise_image(image, dapi_radius_norm)
+                radius_normalisation.radius_normalise_image(
+                    image, dapi_radius_norm, out=image, image_normalisations=image_normalisations[c]
+                )
 
             batch_images.append(image)
             batch_trcs.append((t, r, c))
@@ -198,6 +218,7 @@ def run_filter(
             completed_indices["a"].append((t, r, c))
             dict_io.save_dict(completed_indices, completed_indices_path)
             del filtered_image
+    del image_normalisations
 
     os.remove(config_path)
     os.remove(completed_indices_path)
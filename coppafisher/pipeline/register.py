@@ -1,5 +1,5 @@
-import itertools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
 
 import numpy as np
@@ -65,9 +65,13 @@ def register(
     neighb_dist_thresh_z = config["neighb_dist_thresh_z"]
     if neighb_dist_thresh_z is None:
         neighb_dist_thresh_z = int(np.ceil(neighb_dist_thresh_yx * nbp_basic.pixel_size_xy / nbp_basic.pixel_size_z))
+    if config["icp_max_spots"] < config["icp_min_spots"]:
+        # ICP would then never have enough subsampled spots to run on any channel
+        raise ValueError("The icp_max_spots in 'register' config must be at least icp_min_spots")
 
     # Load in registration data from previous runs of the software
-    registration_data = preprocessing.load_reg_data(nbp_file, nbp_basic)
+    channel_registration_inputs = preprocessing.get_channel_registration_inputs(nbp_file, nbp_basic, config)
+    registration_data = preprocessing.load_reg_data(nbp_file, nbp_basic, channel_registration_inputs)
 
     # Part 1: Channel registration
     if registration_data["channel_registration"]["transform"].max() == 0:
@@ -89,6 +93,9 @@ def register(
         for c in use_channels:
             cam_idx = cameras.index(nbp_basic.channel_camera[c])
             registration_data["channel_registration"]["transform"][c] = cam_transform[cam_idx]
+        # the inputs are saved with the transforms, so they are only reused by later runs with the same inputs
+        registration_data["channel_registration"].update(channel_registration_inputs)
+        preprocessing.save_reg_data(registration_data, nbp_file)
 
     # Part 2: Round registration
     current_process = psutil.Process()
@@ -137,29 +144,41 @@ def register(
     corr_store.close()
     raw_store.close()
     smooth_store.close()
-    for t in tqdm(use_tiles, desc="Optical Flow on uncompleted tiles", total=len(use_tiles)):
-        # Load in the anchor image and the round images. Note that here anchor means anchor round, not necessarily
-        # anchor channel
-        anchor_image = nbp_filter.images[t, nbp_basic.anchor_round, nbp_basic.dapi_channel]
-        for r in use_rounds:
-            round_image = nbp_filter.images[t, r, nbp_basic.dapi_channel]
-            # Now run the registration algorithm on this tile and round
-            register_base.optical_flow_register(
-                target=round_image,
-                base=anchor_image,
-                tile=t,
-                round=r,
-                raw_loc=raw_loc,
-                corr_loc=corr_loc,
-                smooth_loc=smooth_loc,
-                chunks_yx=config["chunks_yx"],
-                overlap=config["overlap_yx"],
-                sample_factor_yx=config["sample_factor_yx"],
-                window_radius=config["window_radius"],
-                smooth_sigma=config["smooth_sigma"],
-                clip_val=config["flow_clip"],
-                n_cores=config["flow_cores"],
-            )
+
+    # The next image is read from disk in a background thread while optical flow runs on the current image.
+    def load_dapi_image(t: int, r: int) -> np.ndarray:
+        return nbp_filter.images[t, r, nbp_basic.dapi_channel]
+
+    tr_indices = [(t, r) for t in use_tiles for r in use_rounds]
+    tr_index = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_round_image = executor.submit(load_dapi_image, *tr_indices[0])
+        for t in tqdm(use_tiles, desc="Optical Flow on uncompleted tiles", total=len(use_tiles)):
+            # Load in the anchor image and the round images. Note that here anchor means anchor round, not necessarily
+            # anchor channel
+            anchor_image = load_dapi_image(t, nbp_basic.anchor_round)
+            for r in use_rounds:
+                round_image = next_round_image.result()
+                tr_index += 1
+                if tr_index < len(tr_indices):
+                    next_round_image = executor.submit(load_dapi_image, *tr_indices[tr_index])
+                # Now run the registration algorithm on this tile and round
+                register_base.optical_flow_register(
+                    target=round_image,
+                    base=anchor_image,
+                    tile=t,
+                    round=r,
+                    raw_loc=raw_loc,
+                    corr_loc=corr_loc,
+                    smooth_loc=smooth_loc,
+                    chunks_yx=config["chunks_yx"],
+                    overlap=config["overlap_yx"],
+                    sample_factor_yx=config["sample_factor_yx"],
+                    window_radius=config["window_radius"],
+                    smooth_sigma=config["smooth_sigma"],
+                    clip_val=config["flow_clip"],
+                    n_cores=config["flow_cores"],
+                )
     del anchor_image, round_image
 
     corr_store = zarr.ZipStore(corr_loc, mode="r")
@@ -183,58 +202,65 @@ def register(
     log.info("Running Iterative Closest Point (ICP)")
     # Initialise variables for ICP step
     ny, nx, nz = nbp_basic.tile_sz, nbp_basic.tile_sz, len(nbp_basic.use_z)
-    use_rounds, c_ref = nbp_basic.use_rounds, nbp_basic.anchor_channel
+    use_rounds, c_ref = list(nbp_basic.use_rounds), nbp_basic.anchor_channel
+    icp_min_spots, icp_max_iter = config["icp_min_spots"], config["icp_max_iter"]
+    icp_error_tol, icp_max_spots = config["icp_error_tol"], config["icp_max_spots"]
+    spot_yxz, spot_no = nbp_find_spots.spot_yxz, nbp_find_spots.spot_no
     icp_correction = np.zeros((n_tiles, n_rounds, n_channels, 4, 3))
     round_correction = np.zeros((n_tiles, n_rounds, 4, 3))
     channel_correction = np.zeros((n_tiles, n_channels, 4, 3))
     # Initialise variables for ICP step
     # 1. round icp stats
-    n_matches_round = np.zeros((n_tiles, n_rounds, config["icp_max_iter"]), dtype=np.int64)
-    mse_round = np.zeros((n_tiles, n_rounds, config["icp_max_iter"]))
+    n_matches_round = np.zeros((n_tiles, n_rounds, icp_max_iter), dtype=np.int32)
+    mse_round = np.zeros((n_tiles, n_rounds, icp_max_iter), dtype=np.float32)
     converged_round = np.zeros((n_tiles, n_rounds), dtype=bool)
     # 2. channel icp stats
-    n_matches_channel = np.zeros((n_tiles, n_channels, config["icp_max_iter"]), dtype=np.int64)
-    mse_channel = np.zeros((n_tiles, n_channels, config["icp_max_iter"]))
+    n_matches_channel = np.zeros((n_tiles, n_channels, icp_max_iter), dtype=np.int32)
+    mse_channel = np.zeros((n_tiles, n_channels, icp_max_iter), dtype=np.float32)
     converged_channel = np.zeros((n_tiles, n_channels), dtype=bool)
+    t_prev = None
     for t in tqdm(use_tiles, desc="ICP on all tiles", total=len(use_tiles)):
+        # load in reference spots
+        ref_spots_t = spot_yxz[f"t{t}r{nbp_basic.anchor_round}c{nbp_basic.anchor_channel}"][:]
         # compute an affine correction to the round transforms. This is done by finding the best affine map that
         # takes the anchor round (post application of optical flow) to the other rounds.
         for r in use_rounds:
             # check if there are enough spots to run ICP
-            if nbp_find_spots.spot_no[t, r, c_ref] < config["icp_min_spots"]:
+            if spot_no[t, r, c_ref] < icp_min_spots:
                 log.warn(f"Tile {t}, round {r}, channel {c_ref} has too few spots to run ICP.")
                 round_correction[t, r][:3, :3] = np.eye(3)
                 continue
-            # load in reference spots
-            ref_spots_tr_ref = nbp_find_spots.spot_yxz[f"t{t}r{nbp_basic.anchor_round}c{nbp_basic.anchor_channel}"][:]
             # apply the flow to the reference spots to put anchor spots in the target frame
-            ref_spots_tr_ref = spot_colours_base.apply_flow_new(ref_spots_tr_ref, flow, t, r)
+            ref_spots_tr_ref = spot_colours_base.apply_flow_new(ref_spots_t, flow, t, r)
             # load in target spots
-            ref_spots_tr = nbp_find_spots.spot_yxz[f"t{t}r{r}c{c_ref}"][:]
+            ref_spots_tr = spot_yxz[f"t{t}r{r}c{c_ref}"][:]
+            ref_spots_tr = register_base.subsample_spots(ref_spots_tr, icp_max_spots, (t, r, c_ref))
             round_correction[t, r], n_matches_round[t, r], mse_round[t, r], converged_round[t, r] = register_base.icp(
                 yxz_base=ref_spots_tr_ref,
                 yxz_target=ref_spots_tr,
                 dist_thresh_yx=neighb_dist_thresh_yx,
                 dist_thresh_z=neighb_dist_thresh_z,
                 start_transform=np.eye(4, 3),
-                n_iters=config["icp_max_iter"],
+                n_iters=icp_max_iter,
                 robust=False,
+                error_tol=icp_error_tol,
             )
             log.info(f"Tile: {t}, Round: {r}, Converged: {converged_round[t, r]}")
+        # the inverse round corrections are the same for every channel, so compute them once per tile
+        round_correction_matrix = np.zeros((len(use_rounds), 4, 4))
+        round_correction_matrix[..., :3] = round_correction[t, use_rounds]
+        round_correction_matrix[..., 3, 3] = 1
+        round_correction_inverse = np.linalg.inv(round_correction_matrix)[..., :3]
         # compute an affine correction to the channel transforms. This is done by finding the best affine map that
         # takes the anchor channel (post application of optical flow and round correction) to the other channels.
         for c in use_channels:
-            im_spots_tc = np.zeros((0, 3))
-            for r in use_rounds:
-                im_spots_trc = nbp_find_spots.spot_yxz[f"t{t}r{r}c{c}"][:]
-                # pad the spots with 1s to make them n_points x 4
-                im_spots_trc = np.pad(im_spots_trc, ((0, 0), (0, 1)), constant_values=1)
+            im_spots_tc = []
+            for i, r in enumerate(use_rounds):
+                im_spots_trc = spot_yxz[f"t{t}r{r}c{c}"][:]
                 # put the spots from round r frame into the anchor frame. this is done in 2 steps:
-                # 1. apply the inverse of the round correction to the spots
-                round_correction_matrix = np.linalg.inv(
-                    np.hstack((round_correction[t, r], np.array([0, 0, 0, 1])[:, None]))
-                )[:, :3]
-                im_spots_trc = np.round(im_spots_trc @ round_correction_matrix).astype(int)
+                # 1. apply the inverse of the round correction to the spots, the linear part then the shift
+                im_spots_trc = im_spots_trc @ round_correction_inverse[i, :3] + round_correction_inverse[i, 3]
+                im_spots_trc = np.round(im_spots_trc).astype(int)
                 # remove spots that are out of bounds
                 oob = (
                     (im_spots_trc[:, 0] < 0)
@@ -247,46 +273,60 @@ def register(
                 im_spots_trc = im_spots_trc[~oob]
                 # 2. apply the inverse of the flow to the spots
                 im_spots_trc = spot_colours_base.apply_flow_new(im_spots_trc, flow, t, r, flow_multiplier=-1.0)
-                im_spots_tc = np.vstack((im_spots_tc, im_spots_trc))
+                im_spots_tc.append(im_spots_trc)
+            im_spots_tc = np.concatenate(im_spots_tc, axis=0) if im_spots_tc else np.zeros((0, 3))
+            im_spots_tc = register_base.subsample_spots(im_spots_tc, icp_max_spots, (t, c))
             # check if there are enough spots to run ICP
-            if im_spots_tc.shape[0] < config["icp_min_spots"]:
+            if im_spots_tc.shape[0] < icp_min_spots:
                 log.warn(f"Tile {t}, channel {c} has too few spots to run ICP.")
                 channel_correction[t, c][:3, :3] = np.eye(3)
                 continue
-            # load in reference spots
-            ref_spots_tr_ref = nbp_find_spots.spot_yxz[f"t{t}r{nbp_basic.anchor_round}c{nbp_basic.anchor_channel}"][:]
+            # the channel correction is mostly a camera effect, so it is similar across tiles. Warm start from the
+            # previous tile's correction when that explicitly converged with enough matches. A single ICP iteration
+            # cannot converge explicitly, so no warm start is done then
+            start_transform = register_base.get_icp_warm_start(
+                start_transform=registration_data["channel_registration"]["transform"][c],
+                previous_transform=None if t_prev is None else channel_correction[t_prev, c],
+                previous_converged=t_prev is not None and converged_channel[t_prev, c] and icp_max_iter > 1,
+                previous_n_matches=0 if t_prev is None else n_matches_channel[t_prev, c, -1],
+                min_matches=icp_min_spots,
+            )
             # run ICP
             channel_correction[t, c], n_matches_channel[t, c], mse_channel[t, c], converged_channel[t, c] = (
                 register_base.icp(
-                    yxz_base=ref_spots_tr_ref,
+                    yxz_base=ref_spots_t,
                     yxz_target=im_spots_tc,
                     dist_thresh_yx=neighb_dist_thresh_yx,
                     dist_thresh_z=neighb_dist_thresh_yx,
-                    start_transform=registration_data["channel_registration"]["transform"][c],
-                    n_iters=config["icp_max_iter"],
+                    start_transform=start_transform,
+                    n_iters=icp_max_iter,
                     robust=False,
+                    error_tol=icp_error_tol,
                 )
             )
             log.info(f"Tile: {t}, Channel: {c}, Converged: {converged_channel[t, c]}")
+        t_prev = t
 
-        # combine these corrections into the icp_correction
-        use_rounds = list(nbp_basic.use_rounds)
-        for t, r, c in itertools.product(use_tiles, use_rounds, use_channels):
-            round_correction_matrix = np.hstack((round_correction[t, r], np.array([0, 0, 0, 1])[:, None]))
-            channel_correction_matrix = np.hstack((channel_correction[t, c], np.array([0, 0, 0, 1])[:, None]))
-            icp_correction[t, r, c] = (channel_correction_matrix @ round_correction_matrix)[:, :3]
+    # combine these corrections into the icp_correction. The channel correction is applied after the round correction,
+    # so icp_correction[t, r, c] = channel_correction_matrix[t, c] @ round_correction[t, r], computed for every t, r, c
+    # in one batched matrix product.
+    channel_correction_matrix = np.zeros((n_tiles, n_channels, 4, 4))
+    channel_correction_matrix[..., :3] = channel_correction
+    channel_correction_matrix[..., 3, 3] = 1
+    use_trc = np.ix_(use_tiles, use_rounds, use_channels)
+    icp_correction[use_trc] = np.einsum("tcij,trjk->trcik", channel_correction_matrix, round_correction)[use_trc]
 
-        registration_data["icp"] = {
-            "icp_correction": icp_correction,
-            "round_correction": round_correction,
-            "channel_correction": channel_correction,
-            "n_matches_round": n_matches_round,
-            "mse_round": mse_round,
-            "converged_round": converged_round,
-            "n_matches_channel": n_matches_channel,
-            "mse_channel": mse_channel,
-            "converged_channel": converged_channel,
-        }
+    registration_data["icp"] = {
+        "icp_correction": icp_correction,
+        "round_correction": round_correction,
+        "channel_correction": channel_correction,
+        "n_matches_round": n_matches_round,
+        "mse_round": mse_round,
+        "converged_round": converged_round,
+        "n_matches_channel": n_matches_channel,
+        "mse_channel": mse_channel,
+        "converged_channel": converged_channel,
+    }
 
     nbp.icp_correction = registration_data["icp"]["icp_correction"]
     nbp.flow_raw = raw
@@ -51,10 +51,11 @@ class ViewOMPColourSum(Subplot):
             max_genes = int(nbp_omp.associated_configs["omp"]["max_genes"])
             dot_product_threshold = float(nbp_omp.associated_configs["omp"]["dot_product_threshold"])
 
-        self.colour = spot_colour.copy().astype(np.float32)
-        self.colour *= nbp_call_spots.colour_norm_factor[spot_tile].astype(np.float32)
+        # astype always copies, so the given spot colour is never modified.
+        self.colour = spot_colour.astype(np.float32)
+        self.colour *= nbp_call_spots.colour_norm_factor[spot_tile].astype(np.float32, copy=False)
         omp_solver = PixelScoreSolver()
-        bled_codes = nbp_call_spots.bled_codes.astype(np.float32)
+        bled_codes = nbp_call_spots.bled_codes.astype(np.float32, copy=False)
         bg_bled_codes = omp_solver.create_background_bled_codes(n_rounds_use, n_channels_use)
         pixel_scores, gene_weights, gene_residuals = omp_solver.solve(
             pixel_colours=self.colour[np.newaxis],
@@ -87,13 +88,15 @@ class ViewOMPColourSum(Subplot):
             width_ratios=[3 for _ in range(column_count - 1)] + [1],
             layout="constrained",
         )
-        self.assigned_bled_codes: np.ndarray = nbp_call_spots.bled_codes[self.assigned_genes].astype(np.float32)
+        self.assigned_bled_codes: np.ndarray = bled_codes[self.assigned_genes]
         # Weight the bled codes.
         self.assigned_bled_codes *= self.gene_weight[:, np.newaxis, np.newaxis]
 
-        abs_max = np.abs(self.assigned_bled_codes).max()
-        abs_max = np.max([abs_max, np.abs(self.colour).max()])
-        abs_max = np.max([abs_max, np.abs(self.gene_residuals).max()]).item()
+        # The largest absolute value is found from each array's extremes, without building absolute value arrays.
+        abs_max = max(
+            float(max(array.max(), -array.min()))
+            for array in (self.assigned_bled_codes, self.colour, self.gene_residuals)
+        )
 
         self.cmap = mpl.cm.seismic
         self.norm = mpl.colors.Normalize(vmin=-abs_max, vmax=abs_max)
@@ -117,7 +120,9 @@ class ViewOMPColourSum(Subplot):
             w_str = "{:.3f}".format(self.gene_weight[i])
             c_str = "{:.3f}".format(self.pixel_score[i])
             self.axes[0, i].set_title(f"{g}: {self.gene_names[g]}\nweight: {w_str}\npixel score: {c_str}")
-            self.axes[0, i].imshow(self.assigned_bled_codes[i].T, cmap=self.cmap, norm=self.norm)
+            self.axes[0, i].imshow(
+                self.assigned_bled_codes[i].T, cmap=self.cmap, norm=self.norm, interpolation="nearest"
+            )
 
         for i in range(self.axes.shape[1] - 1):
             self.axes[1, i].set_xlabel("Round")
@@ -130,9 +135,9 @@ class ViewOMPColourSum(Subplot):
             self.axes[1, i].set_title(
                 r"(Spot colour - bled codes)$\times\epsilon^2$" + f"\nexcept {self.gene_names[g]}"
             )
-            self.axes[1, i].imshow(self.gene_residuals[i].T, cmap=self.cmap, norm=self.norm)
+            self.axes[1, i].imshow(self.gene_residuals[i].T, cmap=self.cmap, norm=self.norm, interpolation="nearest")
 
         self.axes[1, -2].set_title("Spot colour")
-        self.axes[1, -2].imshow(self.colour.T, cmap=self.cmap, norm=self.norm)
+        self.axes[1, -2].imshow(self.colour.T, cmap=self.cmap, norm=self.norm, interpolation="nearest")
 
         self.fig.canvas.draw_idle()
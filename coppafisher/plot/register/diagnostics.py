@@ -1,5 +1,6 @@
 import warnings
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import napari
@@ -8,8 +9,8 @@ import numpy as np
 import skimage
 import torch
 from mpl_toolkits.axes_grid1 import make_axes_locatable
-from PyQt5.QtWidgets import QLabel, QLineEdit, QMainWindow, QPushButton, QSlider
-from qtpy.QtCore import Qt
+from PyQt5.QtWidgets import QButtonGroup, QLabel, QLineEdit, QMainWindow, QPushButton, QSlider
+from qtpy.QtCore import Qt, QTimer
 from scipy.ndimage import affine_transform
 from scipy.spatial import KDTree
 from superqt import QRangeSlider
@@ -22,6 +23,9 @@ from coppafisher.spot_colours.base import apply_affine, apply_flow_new
 
 
 class RegistrationViewer:
+    # The maximum number of tiles whose images are kept in memory.
+    _max_cached_tiles: int = 4
+
     def __init__(self, nb: Notebook, config_path: Optional[str] = None, t: Optional[int] = None):
         """
         Viewer for the registration of an experiment.
@@ -45,47 +49,81 @@ class RegistrationViewer:
             config_path = nb.config_path
         self.t = t
         self.nbp_file = file_names.get_file_names(nb.basic_info, config_path)
+        # Loaded images for the most recently viewed tiles, with the most recent last.
+        self._tile_images: Dict[int, Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]] = {}
+        # Each image layer with whether it shows a round (0) or channel (1) image and the image's name.
+        self._image_layers: List[Tuple[napari.layers.Image, int, str]] = []
         self.viewer = napari.Viewer()
         self.add_images()
         self.format_viewer()
         napari.run()
 
-    def add_images(self):
+    def get_images(self, t: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
         """
-        Load images for the selected tile and add them to the viewer.
+        Load the round and channel images for the given tile. The most recently viewed tiles are kept in memory, so
+        switching back to them does not read from disk again.
+
+        Args:
+            t (int): tile index.
+
+        Returns:
+            - (dict[str, ndarray]): round_im. Round images for each round name and the anchor dapi image.
+            - (dict[str, ndarray]): channel_im. Channel images for each channel name and the anchor image.
         """
+        if t in self._tile_images:
+            # Move the tile to the end so it is the last to be forgotten.
+            self._tile_images[t] = self._tile_images.pop(t)
+            return self._tile_images[t]
+
         # load round images
         round_im, channel_im = {}, {}
         for r in list(self.nb.basic_info.use_rounds):
-            round_im[f"r{r}"] = self.nb.register.round_images[self.t, r]
+            round_im[f"r{r}"] = self.nb.register.round_images[t, r]
         # repeat anchor image 3 times along new 0 axis
-        im_anchor = self.nb.register.anchor_images[self.t, 0]
+        im_anchor = self.nb.register.anchor_images[t, 0]
         round_im["anchor"] = np.repeat(im_anchor[None], 3, axis=0)
         # load channel images
         for c in list(self.nb.basic_info.use_channels):
-            channel_im[f"c{c}"] = self.nb.register.channel_images[self.t, c]
+            channel_im[f"c{c}"] = self.nb.register.channel_images[t, c]
         # repeat anchor image 3 times along new 0 axis
-        im_anchor = self.nb.register.anchor_images[self.t, 1]
+        im_anchor = self.nb.register.anchor_images[t, 1]
         channel_im["anchor"] = np.repeat(im_anchor[None], 3, axis=0)
 
-        # clear previous images
-        self.viewer.layers.select_all()
-        self.viewer.layers.remove_selected()
+        if len(self._tile_images) >= self._max_cached_tiles:
+            del self._tile_images[next(iter(self._tile_images))]
+        self._tile_images[t] = round_im, channel_im
+        return round_im, channel_im
+
+    def add_images(self):
+        """
+        Load images for the selected tile and add them to the viewer.
+        """
+        round_im, channel_im = self.get_images(self.t)
         yx_size = round_im["r0"].shape[1]
         unit_step = yx_size * 1.1
+        if self._image_layers:
+            # The layers from a previous tile are reused, so only their data and the tile text are replaced.
+            for layer, images, name in self._image_layers:
+                layer.data = (round_im, channel_im)[images][name]
+            self.viewer.layers.remove("text")
+            self.add_text(round_im, unit_step)
+            return
+
         # add round images
         for i, r in enumerate(self.nb.basic_info.use_rounds):
             offset = tuple([0, 0, i * unit_step, 0])
-            self.viewer.add_image(
+            layer = self.viewer.add_image(
                 round_im[f"r{r}"], name=f"r{r}", blending="additive", colormap="green", translate=offset
             )
-            self.viewer.add_image(
+            self._image_layers.append((layer, 0, f"r{r}"))
+            layer = self.viewer.add_image(
                 round_im["anchor"], name="anchor_dapi", blending="additive", colormap="red", translate=offset
             )
+            self._image_layers.append((layer, 0, "anchor"))
         # add channel images
         for i, c in enumerate(self.nb.basic_info.use_channels):
             offset = tuple([0, unit_step, i * unit_step, 0])
-            self.viewer.add_image(
+            layer = self.viewer.add_image(
                 channel_im[f"c{c}"],
                 name=f"c{c}",
                 blending="additive",
@@ -93,7 +131,8 @@ class RegistrationViewer:
                 translate=offset,
                 contrast_limits=(30, 255),
             )
-            self.viewer.add_image(
+            self._image_layers.append((layer, 1, f"c{c}"))
+            layer = self.viewer.add_image(
                 channel_im["anchor"],
                 name="anchor_seq",
                 blending="additive",
@@ -101,18 +140,33 @@ class RegistrationViewer:
                 translate=offset,
                 contrast_limits=(10, 180),
             )
+            self._image_layers.append((layer, 1, "anchor"))
         # label axes
         self.viewer.dims.axis_labels = ["method", "y", "x", "z"]
         # set default order for axes as (method, z, y, x)
         self.viewer.dims.order = (0, 3, 1, 2)
+        self.add_text(round_im, unit_step)
+
+    def add_text(self, round_im: Dict[str, np.ndarray], unit_step: float):
+        """
+        Add the text layer labelling the tile and registration method above the round images.
+
+        Args:
+            round_im (dict[str, ndarray]): round images of the selected tile.
+            unit_step (float): distance between neighbouring images in the viewer.
+        """
         # Add points to attach text
         n_methods, n_z = 3, round_im["r0"].shape[-1]
         n_rounds = len(round_im)
         mid_x = unit_step * (n_rounds - 1) // 2
-        points = [[i, -unit_step // 4, mid_x, z] for i in range(n_methods) for z in range(n_z)]
+        # one point per method and z plane, in (method, y, x, z) order
+        points = np.empty((n_methods * n_z, 4))
+        points[:, 0], points[:, 3] = np.divmod(np.arange(n_methods * n_z), n_z)
+        points[:, 1] = -unit_step // 4
+        points[:, 2] = mid_x
         method_names = ["unregistered", "optical flow", "optical flow + ICP"]
         text = {
-            "string": [f"tile: {self.t}, method: {method_names[i]}" for i in range(n_methods) for _ in range(n_z)],
+            "string": np.repeat([f"tile: {self.t}, method: {name}" for name in method_names], n_z),
             "color": "white",
             "size": 10,
         }
@@ -127,20 +181,23 @@ class RegistrationViewer:
         Returns:
             layer_ind: list of indices of the layers in the viewer
         """
-        if layer == "round":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name[0] == "r"]
-        elif layer == "round_anchor":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name == "anchor_dapi"]
-        elif layer == "channel":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name[0] == "c"]
-        elif layer == "channel_anchor":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name == "anchor_seq"]
-        elif layer == "imaging":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name[0] in ["r", "c"]]
-        elif layer == "anchor":
-            layer_ind = [self.viewer.layers.index(l) for l in self.viewer.layers if l.name[:6] == "anchor"]
-        else:
+        if layer not in ("round", "round_anchor", "channel", "channel_anchor", "imaging", "anchor"):
             raise ValueError(f"Layer {layer} is not recognized.")
+
+        def is_layer(name: str) -> bool:
+            if layer == "round":
+                return name[0] == "r"
+            elif layer == "round_anchor":
+                return name == "anchor_dapi"
+            elif layer == "channel":
+                return name[0] == "c"
+            elif layer == "channel_anchor":
+                return name == "anchor_seq"
+            elif layer == "imaging":
+                return name[0] in ["r", "c"]
+            return name[:6] == "anchor"
+
+        layer_ind = [i for i, l in enumerate(self.viewer.layers) if is_layer(l.name)]
         return layer_ind
 
     def format_viewer(self):
@@ -179,7 +236,13 @@ class RegistrationViewer:
             self.viewer.window.add_dock_widget(slider, area="left", name=labels[i])
             slider.setRange(0, 255)
             slider.setValue((0, 255))
-            slider.valueChanged.connect(lambda value, j=i: self.update_contrast_limits(layer_ind[j], value))
+            # Dragging a slider only restarts the timer, so the layers are updated once with the latest value rather
+            # than redrawn for every intermediate value.
+            timer = QTimer(slider)
+            timer.setSingleShot(True)
+            timer.setInterval(16)
+            timer.timeout.connect(lambda j=i, s=slider: self.update_contrast_limits(layer_ind[j], s.value()))
+            slider.valueChanged.connect(lambda _, timer=timer: timer.start())
 
     def add_switch_button(self):
         # add buttons to switch on/off the layers
@@ -195,7 +258,12 @@ class RegistrationViewer:
         button_name = [f"t{t}" for t in self.nb.basic_info.use_tiles]
         button = ButtonCreator(button_name, button_loc, size=(50, 28))
         self.viewer.window.add_dock_widget(button, area="left", name="tiles")
+        # Qt keeps only the selected tile's button checked, so the buttons never need unchecking one by one.
+        self.tile_button_group = QButtonGroup(button)
+        self.tile_button_group.setExclusive(True)
         for i, b in enumerate(button.buttons):
+            self.tile_button_group.addButton(b)
+            b.setChecked(self.nb.basic_info.use_tiles[i] == self.t)
             b.clicked.connect(lambda _, t=self.nb.basic_info.use_tiles[i]: self.switch_tile(t))
 
     def add_optical_flow_buttons(self):
@@ -516,27 +584,20 @@ class ICPPointCloudViewer:
         # 3, 4 are lines
         # 5 is the score
 
-        # adjust the z-coordinates of the points layers
+        z_min, z_max = current_z - z_thick / 2, current_z + z_thick / 2
+
+        # adjust the z-coordinates of the points layers in place
         for i in range(3):
-            z_coords = self.viewer.layers[i].data[:, 0].copy()
-            in_range = np.abs(z_coords - current_z) <= z_thick / 2
-            z_coords[in_range] = current_z
-            self.viewer.layers[i].data[:, 0] = z_coords
+            z_coords = self.viewer.layers[i].data[:, 0]
+            z_coords[(z_coords >= z_min) & (z_coords <= z_max)] = current_z
             self.viewer.layers[i].refresh()
 
-        # adjust the z-coords of the lines layers
+        # adjust the z-coords of the lines layers, only moving lines with both ends in range
         for i in range(3, 5):
-            line_coords = np.array(self.viewer.layers[i].data.copy())
-            # get the z-coords and modify them
-            line_coords_z_lower, line_coords_z_upper = line_coords[:, 0, 0].copy(), line_coords[:, 1, 0].copy()
-            in_range_lower = np.abs(line_coords_z_lower - current_z) <= z_thick / 2
-            in_range_upper = np.abs(line_coords_z_upper - current_z) <= z_thick / 2
-            in_range = in_range_lower & in_range_upper
-            line_coords_z_lower[in_range] = current_z
-            line_coords_z_upper[in_range] = current_z
-            # update the line coords array with the new z-coords
-            line_coords[:, 0, 0] = line_coords_z_lower
-            line_coords[:, 1, 0] = line_coords_z_upper
+            line_coords = np.array(self.viewer.layers[i].data)
+            line_coords_z = line_coords[:, :, 0]
+            in_range = ((line_coords_z >= z_min) & (line_coords_z <= z_max)).all(1)
+            line_coords_z[in_range] = current_z
             self.viewer.layers[i].data = list(line_coords)
             self.viewer.layers[i].refresh()
 
@@ -614,9 +675,9 @@ def generate_button_positions(
     Returns:
         button_positions: np.ndarray of shape (n_buttons, 2) with x and y positions for each button
     """
-    x = x_offset + x_spacing * (np.arange(n_buttons) % n_cols)
-    y = y_offset + y_spacing * (np.arange(n_buttons) // n_cols)
-    button_positions = np.array([(x[i], y[i]) for i in range(n_buttons)])
+    button_positions = np.empty((n_buttons, 2), dtype=int)
+    button_positions[:, 0] = x_offset + x_spacing * (np.arange(n_buttons) % n_cols)
+    button_positions[:, 1] = y_offset + y_spacing * (np.arange(n_buttons) // n_cols)
     return button_positions
 
 
@@ -699,13 +760,10 @@ def view_icp_correction(nb: Notebook, t: int):
     """
     use_rounds = nb.basic_info.use_rounds
     use_channels = nb.basic_info.use_channels
-    transform = nb.register.icp_correction[t][np.ix_(use_rounds, use_channels)].copy()
-    scale, shift = np.zeros((len(use_rounds), len(use_channels), 3)), np.zeros((len(use_rounds), len(use_channels), 3))
-    # populate scales and shifts
-    for r, c in np.ndindex(len(use_rounds), len(use_channels)):
-        transform_rc = transform[r, c]
-        scale[r, c] = transform_rc[:3, :3].diagonal()
-        shift[r, c] = transform_rc[3]
+    transform = nb.register.icp_correction[t][np.ix_(use_rounds, use_channels)]
+    # scales and shifts have shape (n_rounds_use, n_channels_use, 3)
+    scale = transform[:, :, :3, :3].diagonal(axis1=-2, axis2=-1)
+    shift = transform[:, :, 3]
 
     # create plots
     fig, ax = plt.subplots(2, 3, figsize=(15, 10))
@@ -754,14 +812,16 @@ def view_icp_iters(nb: Notebook, t: int):
     spot_no = nb.find_spots.spot_no[t]
     mse = [nb.register_debug.mse_round[t, use_rounds], nb.register_debug.mse_channel[t, use_channels]]
     n_matches = [nb.register_debug.n_matches_round[t, use_rounds], nb.register_debug.n_matches_channel[t, use_channels]]
-    frac_matches = n_matches.copy()
-    for i, r in enumerate(use_rounds):
-        # calculate the fraction of matches
-        frac_matches[0][i] = n_matches[0][i] / spot_no[r, anchor_channel]
-    for i, c in enumerate(use_channels):
-        # calculate the fraction of matches
-        total_spots = np.sum(spot_no[use_rounds, c])
-        frac_matches[1][i] = n_matches[1][i] / total_spots
+    # calculate the fraction of matches, dividing by the anchor spots for rounds and all round spots for channels. ICP
+    # only matches against at most icp_max_spots target spots, so the spot counts are capped at it too. Notebooks
+    # registered before icp_max_spots existed used every spot
+    icp_max_spots = nb.register.associated_configs["register"].get("icp_max_spots")
+    if icp_max_spots is None:
+        icp_max_spots = np.inf
+    frac_matches = [
+        n_matches[0] / np.minimum(spot_no[use_rounds, anchor_channel], icp_max_spots)[:, None],
+        n_matches[1] / np.minimum(spot_no[np.ix_(use_rounds, use_channels)].sum(0), icp_max_spots)[:, None],
+    ]
     # create plots
     n_cols = max(n_rounds, n_channels)
     fig, ax = plt.subplots(4, n_cols, figsize=(4 * n_cols, 10))
@@ -821,10 +881,10 @@ def view_camera_correction(nb: Notebook, config_path: Optional[str] = None):
         fluorescent_beads[i][bead_pixels] = threshold
 
     # obtain the initial transform for each channel
-    transform = np.repeat(np.eye(2, 3)[None, :, :], 4, axis=0)
-    for i, c in enumerate(cam_channels):
-        transform[i][:2, :2] = nb.register_debug.channel_transform_initial[c][:2, :2].T
-        transform[i][:2, -1] = nb.register_debug.channel_transform_initial[c][-1, :2]
+    channel_transform_initial = nb.register_debug.channel_transform_initial[cam_channels]
+    transform = np.zeros((4, 2, 3))
+    transform[:, :2, :2] = channel_transform_initial[:, :2, :2].transpose((0, 2, 1))
+    transform[:, :2, -1] = channel_transform_initial[:, -1, :2]
 
     # get the spots from the circle detection
     bead_point_clouds = []
@@ -847,19 +907,28 @@ def view_camera_correction(nb: Notebook, config_path: Optional[str] = None):
         bead_point_clouds.append(np.vstack((cy, cx)).T)
 
     # Apply the transform to the fluorescent bead images
+    # Each camera is transformed in its own thread, writing into its own slice of the output. SciPy releases the GIL
+    # while interpolating, so the cameras are transformed concurrently.
     fluorescent_beads_transformed = np.zeros(fluorescent_beads.shape)
-    for c in range(3):
-        fluorescent_beads_transformed[c] = affine_transform(fluorescent_beads[c], transform[c], order=3)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(
+                affine_transform, fluorescent_beads[c], transform[c], order=3, output=fluorescent_beads_transformed[c]
+            )
+            for c in range(3)
+        ]
+        for future in futures:
+            future.result()
     # The last channel is the anchor channel (no transform)
     fluorescent_beads_transformed[3] = np.copy(fluorescent_beads[3])
 
     # Transform the bead point clouds to the anchor frame of reference
+    transform_homogeneous = np.concatenate((transform, np.tile([0, 0, 1], (4, 1, 1))), axis=1)
+    affine = np.linalg.inv(transform_homogeneous[:3])
     bead_point_clouds_transformed = []
-    for _ in range(3):
+    for c in range(3):
         points = np.hstack((bead_point_clouds[c], np.ones((bead_point_clouds[c].shape[0], 1))))
-        affine = np.linalg.inv(np.vstack((transform[c], [0, 0, 1])))
-        points_transformed = points @ affine.T
-        bead_point_clouds_transformed.append(points_transformed)
+        bead_point_clouds_transformed.append(points @ affine[c].T)
 
     # Add the images to napari
     colours = ["red", "green", "blue"]
@@ -933,18 +1002,17 @@ def view_overlay(nb: Notebook, t: int = None, rc: list = None):
 
     icp_correction = nb.register.icp_correction
     icp_correction[:, :, nb.basic_info.dapi_channel] = icp_correction[:, :, nb.basic_info.anchor_channel]
+    # every tile pixel position, built once and shared by all the registered images
+    tile_shape = (nb.basic_info.tile_sz, nb.basic_info.tile_sz, len(nb.basic_info.use_z))
+    yxz_all = np.indices(tile_shape, dtype=np.int16).reshape((3, -1), order="F").T
     # load, affine correct, and flow correct the images
     for i, rc_pair in tqdm(enumerate(rc), total=len(rc), desc="Loading images"):
         # LOAD IMAGE
         r, c = rc_pair
         # if the anchor round, no need tp apply registration
         if r == nb.basic_info.anchor_round:
-            im[i] = nb.filter.images[t, r, c].astype(np.float32)
+            im[i] = nb.filter.images[t, r, c]
         else:
-            tile_shape = (nb.basic_info.tile_sz, nb.basic_info.tile_sz, len(nb.basic_info.use_z))
-            yxz_all = [np.linspace(0, tile_shape[i] - 1, tile_shape[i]) for i in range(3)]
-            yxz_all = np.array(np.meshgrid(*yxz_all, indexing="ij")).astype(np.int16).reshape((3, -1), order="F").T
-
             spot_colour_kwargs = dict(
                 image=nb.filter.images,
                 flow=nb.register.flow,
@@ -701,18 +701,14 @@ class Viewer:
         fig, ax = plt.subplots(1, 1, figsize=(12, 9))
         ax.set_title(r"$\mathbf{Hotkeys}$", fontdict={"size": 20, "va": "center"})
         ax.set_axis_off()
-        text = r"$\mathbf{Legend}$" + "\n"
-        for help_line in self.legend_.get_help():
-            text += help_line + "\n"
-        unique_sections = []
+        # Group the hotkey help lines by section in a single pass, keeping the order sections first appear in.
+        section_lines: dict[str, list[str]] = {}
         for hotkey in self.hotkeys:
-            if hotkey.section not in unique_sections:
-                unique_sections.append(hotkey.section)
-        for section in unique_sections:
-            text += "\n" + r"$\mathbf{" + section.capitalize().replace(" ", r"\ ") + r"}$" + "\n"
-            section_hotkeys = [hotkey for hotkey in self.hotkeys if hotkey.section == section]
-            for hotkey in section_hotkeys:
-                text += str(hotkey) + "\n"
+            section_lines.setdefault(hotkey.section, []).append(str(hotkey))
+        lines = [r"$\mathbf{Legend}$", *self.legend_.get_help()]
+        for section, hotkey_lines in section_lines.items():
+            lines += ["", r"$\mathbf{" + section.capitalize().replace(" ", r"\ ") + r"}$", *hotkey_lines]
+        text = "\n".join(lines) + "\n"
         ax.text(0.5, 0.5, text, size=12, va="center", ha="center")
         if self.show:
             fig.show()
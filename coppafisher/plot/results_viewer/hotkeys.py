@@ -14,6 +14,8 @@ class Hotkey:
     ):
         self.name = name
         self.key_press = key_press
+        # The key press as shown to the user, e.g. "Shift-K" is shown as "shift + k".
+        self.key_press_display = key_press.lower().replace("-", " + ")
         self.description = description
         self.invoke = invoke
         self.section = section
@@ -23,7 +25,7 @@ class Hotkey:
         msg = "("
         if self.requires_selection:
             msg += "Select Spot, "
-        msg += f"Press {self.key_press.lower().replace('-', ' + ')}) {self.name}"
+        msg += f"Press {self.key_press_display}) {self.name}"
         if self.description:
             msg += f": {self.description}"
         return msg
@@ -337,8 +337,8 @@ def interpolate_flow(
     )
 
     # reshape coords and flow_z_crop and pad coords with 1s for linear regression
-    coords = coords.reshape(3, -1).T
-    coords_pad = np.pad(coords, [(0, 0), (0, 1)], constant_values=1)
+    coords_pad = np.ones((coords[0].size, 4), dtype=np.float32)
+    coords_pad[:, :3] = coords.reshape(3, -1).T
     flow_z_crop = flow_z_crop.reshape(-1)
     # compute linear regression
     coefficients = np.linalg.lstsq(a=coords_pad, b=flow_z_crop, rcond=None)[0]
@@ -351,8 +351,8 @@ def interpolate_flow(
         dtype=np.float32,
     )
     coords = coords.reshape(3, -1).T
-    coords_pad = np.pad(coords, [(0, 0), (0, 1)], constant_values=1)
-    flow_smooth[2] = (coords_pad @ coefficients).reshape(
+    # The constant term is added on rather than padding every image coordinate with a 1.
+    flow_smooth[2] = (coords @ coefficients[:3] + coefficients[3]).reshape(
         flow_smooth.shape[1], flow_smooth.shape[2], flow_smooth.shape[3]
     )
     del coords, coords_pad, flow_z_crop, coefficients
@@ -517,6 +517,25 @@ def channel_registration(
     return transform
 
 
+def subsample_spots(yxz: np.ndarray, max_spots: int, seed: Tuple[int, ...]) -> np.ndarray:
+    """
+    Randomly subsample the given spots to at most `max_spots` spots. The subsample is reproducible for the same seed.
+
+    Args:
+        yxz (`(n_spots x 3) ndarray`): spot positions.
+        max_spots (int): maximum number of spots to keep.
+        seed (tuple of int): random seed, typically the tile, round, and channel indices.
+
+    Returns:
+        (`(min(n_spots, max_spots) x 3) ndarray`): yxz_subset. The subsampled spot positions, in their original order.
+    """
+    if yxz.shape[0] <= max_spots:
+        return yxz
+    rng = np.random.default_rng(seed)
+    keep = np.sort(rng.choice(yxz.shape[0], max_spots, replace=False))
+    return yxz[keep]
+
+
 # Function which runs a single iteration of the icp algorithm
 def get_transform(
     yxz_base: np.ndarray,
@@ -595,7 +614,7 @@ def get_transform(
 
 
 # Simple ICP implementation, calls above until no change
-def icp(yxz_base, yxz_target, dist_thresh_yx, dist_thresh_z, start_transform, n_iters, robust=False):
+def icp(yxz_base, yxz_target, dist_thresh_yx, dist_thresh_z, start_transform, n_iters, robust=False, error_tol=0.0):
     """
     Applies n_iters rounds of the above least squares regression
     Args:
@@ -610,6 +629,8 @@ def icp(yxz_base, yxz_target, dist_thresh_yx, dist_thresh_z, start_transform, n_
             Typical: ```2```.
         n_iters: max number of times to compute regression
         robust: whether to compute robust icp
+        error_tol (float, optional): stop early once the error changes by less than this between two successive
+            iterations. Default: 0, only stop early when the neighbours do not change.
     Returns:
         - ```transform``` - ```float [4 x 3]```.
             Updated affine transform.
@@ -618,29 +639,59 @@ def icp(yxz_base, yxz_target, dist_thresh_yx, dist_thresh_z, start_transform, n_
         - ```error``` - ```float```.
             Average distance between ```neighbours``` below ```dist_thresh```.
         - converged - bool
-            True if completed in less than n_iters and false o/w
+            True if a stopping criterion was met in less than n_iters, or n_iters is 1, and false o/w
     """
     # initialise transform
     transform = start_transform
     n_matches = np.zeros(n_iters)
     error = np.zeros(n_iters)
-    prev_neighbour = np.ones(yxz_target.shape[0]) * yxz_base.shape[0]
 
     # Update transform. We want this to have max n_iters iterations. We will end sooner if all neighbours do not change
-    # in 2 successive iterations. Define the variables for iteration 0 before we start the loop
+    # in 2 successive iterations or the error has stopped changing. Define the variables for iteration 0 before we
+    # start the loop
     transform, neighbour, n_matches[0], error[0] = get_transform(
         yxz_base, yxz_target, transform, dist_thresh_yx, dist_thresh_z, robust
     )
     i = 0
-    while i + 1 < n_iters and not all(prev_neighbour == neighbour):
+    # A single iteration has nothing to compare against, so it is reported as converged
+    converged = n_iters == 1
+    while not converged and i + 1 < n_iters:
         # update i and prev_neighbour
         prev_neighbour, i = neighbour, i + 1
         transform, neighbour, n_matches[i], error[i] = get_transform(
             yxz_base, yxz_target, transform, dist_thresh_yx, dist_thresh_z, robust
         )
+        converged = np.array_equal(prev_neighbour, neighbour) or abs(error[i] - error[i - 1]) < error_tol
     # now fill in any variables that were not completed due to early exit
-    n_matches[i:] = n_matches[i] * np.ones(n_iters - i)
-    error[i:] = error[i] * np.ones(n_iters - i)
-    converged = i < n_iters
+    n_matches[i:] = n_matches[i]
+    error[i:] = error[i]
 
     return transform, n_matches, error, converged
+
+
+def get_icp_warm_start(
+    start_transform: np.ndarray,
+    previous_transform: Optional[np.ndarray],
+    previous_converged: bool,
+    previous_n_matches: int,
+    min_matches: int,
+) -> np.ndarray:
+    """
+    Get the ICP start transform, warm started from a previous, similar ICP result.
+
+    The previous transform is only used when its ICP explicitly converged, i.e. stopped on a stopping criterion before
+    the iteration cap, with at least `min_matches` matches. Otherwise, `start_transform` is returned unchanged.
+
+    Args:
+        start_transform (`(4 x 3) ndarray`): the default start transform.
+        previous_transform (`(4 x 3) ndarray` or none): the previous ICP result. None if there is no previous result.
+        previous_converged (bool): whether the previous ICP converged.
+        previous_n_matches (int): the number of matches in the previous ICP's final iteration.
+        min_matches (int): the fewest matches the previous ICP must have to be used.
+
+    Returns:
+        (`(4 x 3) ndarray`): start_transform. The average of the two transforms if warm started.
+    """
+    if previous_transform is None or not previous_converged or previous_n_matches < min_matches:
+        return start_transform
+    return 0.5 * (start_transform + previous_transform)
@@ -9,16 +9,52 @@ import zarr
 from scipy import signal
 from tqdm import tqdm
 
-from .. import spot_colours
+from .. import log, spot_colours
+from ..setup.config_section import ConfigSection
 from ..setup.notebook_page import NotebookPage
 
+REG_DATA_NAME = "registration_data.npz"
+REG_DATA_SEPARATOR = "/"
 
-def load_reg_data(nbp_file: NotebookPage, nbp_basic: NotebookPage):
+
+def get_channel_registration_inputs(
+    nbp_file: NotebookPage, nbp_basic: NotebookPage, config: ConfigSection
+) -> dict[str, np.ndarray | str | int]:
+    """
+    Get every input that the channel registration transforms depend on. They are saved with the transforms, so a saved
+    channel registration is only reused while these are unchanged.
+
+    Args:
+        nbp_file (NotebookPage): `file_names` notebook page.
+        nbp_basic (NotebookPage): `basic_info` notebook page.
+        config (ConfigSection): `register` config section.
+
+    Returns:
+        (dict[str, ndarray or str or int]): inputs. Each input's name and value. Unset values are given as an empty
+            string or -1, so every value can be saved without pickling.
     """
-    Function to load in pkl file of previously obtained registration data if it exists.
+    fluorescent_bead_path = nbp_file.fluorescent_bead_path
+    bead_radii = config["bead_radii"]
+    anchor_channel = nbp_basic.anchor_channel
+    return {
+        "fluorescent_bead_path": "" if fluorescent_bead_path is None else fluorescent_bead_path,
+        "bead_radii": "" if bead_radii is None else np.asarray(bead_radii, dtype=float),
+        "channel_camera": np.asarray(nbp_basic.channel_camera),
+        "anchor_channel": -1 if anchor_channel is None else anchor_channel,
+        "use_channels": np.asarray(nbp_basic.use_channels, dtype=int),
+    }
+
+
+def load_reg_data(nbp_file: NotebookPage, nbp_basic: NotebookPage, channel_registration_inputs: dict):
+    """
+    Function to load in previously obtained registration data if it exists. The data is read from
+    `registration_data.npz`. A legacy `registration_data.pkl` file is still read if there is no npz file. A saved
+    channel registration is discarded, so it is computed again, if it was computed from different inputs.
     Args:
         nbp_file: File Names notebook page
         nbp_basic: Basic info notebook page
+        channel_registration_inputs: the current channel registration inputs, given by
+            `get_channel_registration_inputs`.
     Returns:
         registration_data: dictionary with the following keys
         * round_registration (dict) with keys:
@@ -26,26 +62,53 @@ def load_reg_data(nbp_file: NotebookPage, nbp_basic: NotebookPage):
             * warp_directory (str)
         * channel_registration (dict) with keys:
             * transform (n_channels x 4 x 3) ndarray of affine transforms (zyx)
+            * every channel registration input the transforms were computed from, once computed
     """
+    npz_path = os.path.join(nbp_file.output_dir, REG_DATA_NAME)
+    pkl_path = os.path.join(nbp_file.output_dir, "registration_data.pkl")
     # Check if the registration data file exists
-    if os.path.isfile(os.path.join(nbp_file.output_dir, "registration_data.pkl")):
-        with open(os.path.join(nbp_file.output_dir, "registration_data.pkl"), "rb") as f:
+    if os.path.isfile(npz_path):
+        registration_data = {}
+        with np.load(npz_path, allow_pickle=False) as file:
+            for key in file.files:
+                group_name, name = key.split(REG_DATA_SEPARATOR, 1)
+                value = file[key]
+                registration_data.setdefault(group_name, {})[name] = value.item() if value.ndim == 0 else value
+    elif os.path.isfile(pkl_path):
+        with open(pkl_path, "rb") as f:
             registration_data = pickle.load(f)
     else:
-        _, _, n_channels = (
-            nbp_basic.n_tiles,
-            nbp_basic.n_rounds + nbp_basic.n_extra_rounds,
-            nbp_basic.n_channels,
-        )
         round_registration = {"flow_dir": os.path.join(nbp_file.output_dir, "flow")}
-        channel_registration = {"transform": np.zeros((n_channels, 4, 3))}
-        registration_data = {
-            "round_registration": round_registration,
-            "channel_registration": channel_registration,
-        }
+        registration_data = {"round_registration": round_registration}
+    channel_registration = registration_data.get("channel_registration", {})
+    inputs_match = all(
+        name in channel_registration and np.array_equal(channel_registration[name], value)
+        for name, value in channel_registration_inputs.items()
+    )
+    if not inputs_match:
+        if "channel_registration" in registration_data:
+            log.info("Channel registration inputs have changed since it was saved, so it will be computed again")
+        registration_data["channel_registration"] = {"transform": np.zeros((nbp_basic.n_channels, 4, 3))}
     return registration_data
 
 
+def save_reg_data(registration_data: dict, nbp_file: NotebookPage) -> None:
+    """
+    Save the registration data to `registration_data.npz` in the output directory, overwriting any existing file. Each
+    variable is stored as its own npz array, so no pickling is needed and it can be loaded by `load_reg_data`.
+
+    Args:
+        registration_data (dict): registration data, a dictionary of dictionaries. Each inner value must be a numpy
+            array or a number/string.
+        nbp_file (NotebookPage): `file_names` notebook page.
+    """
+    arrays = {}
+    for group_name, group in registration_data.items():
+        for name, value in group.items():
+            arrays[group_name + REG_DATA_SEPARATOR + name] = np.asarray(value)
+    np.savez(os.path.join(nbp_file.output_dir, REG_DATA_NAME), **arrays)
+
+
 def split_image(im: np.ndarray, n_subvols_yx: int, overlap: float = 0.25) -> Tuple[np.ndarray, np.ndarray]:
     """
     Function to split an image into yx subvolumes with overlap. If the image does not divide evenly into subvolumes with
@@ -260,14 +323,15 @@ def generate_reg_images(
 
     # get the round images, apply optical flow, optical flow + icp, concatenate and save
     icp_correction = nbp_register.icp_correction
+    # the identity affine is the same for every tile, so it is built once
+    identity_affine = np.zeros((n_tiles, n_rounds, n_channels, 4, 3))
+    identity_affine[:, :, :, :3, :3] = np.eye(3)
     for t in tqdm(use_tiles, desc="Round Images", total=len(use_tiles)):
-        affine = np.zeros((n_tiles, n_rounds, n_channels, 4, 3))
-        affine[:, :, :, :3, :3] = np.eye(3)
         im_t_flow = spot_colours.base.get_spot_colours_new_safe(
             nbp_basic,
             image=nbp_filter.images,
             flow=nbp_register.flow,
-            affine=affine,
+            affine=identity_affine,
             yxz=yxz_coords,
             use_rounds=use_rounds,
             use_channels=[dapi_channel],
@@ -301,15 +365,13 @@ def generate_reg_images(
 
     # get the channel images, save, apply optical flow + channel transform initial, save, apply icp, save
     r_mid = 3
+    channel_affine = np.tile(nbp_register_debug.channel_transform_initial, (n_tiles, n_rounds, 1, 1, 1))
     for t in tqdm(use_tiles, desc="Channel Images", total=len(use_tiles)):
-        affine = nbp_register_debug.channel_transform_initial
-        affine = np.repeat(affine[None], n_rounds, axis=0)
-        affine = np.repeat(affine[None], n_tiles, axis=0)
         im_t_flow = spot_colours.base.get_spot_colours_new_safe(
             nbp_basic,
             image=nbp_filter.images,
             flow=nbp_register.flow,
-            affine=affine,
+            affine=channel_affine,
             yxz=yxz_coords,
             use_rounds=use_rounds,
             use_channels=use_channels,
@@ -383,10 +445,10 @@ def fill_to_uint8(array: np.ndarray) -> np.ndarray[np.uint8]:
     assert array.size > 0, "Given array cannot be empty"
 
     im_min, im_max = np.min(array), np.max(array)
-    array = array - im_min
+    array = array.astype(np.float32) - im_min
     # Save the image as uint8
-    if im_max != 0:
-        array = array / np.max(array) * 255  # Scale to 0-255
+    if im_max > im_min:
+        array *= 255 / (im_max - im_min)  # Scale to 0-255
     array = array.astype(np.uint8)
     return array
 
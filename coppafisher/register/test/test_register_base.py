@@ -80,3 +80,60 @@ def test_optical_flow_single():
     assert np.sum(correct_y) / (ny * nx * nz) > 0.99
     assert np.sum(correct_x) / (ny * nx * nz) > 0.99
     assert np.sum(correct_z) / (ny * nx * nz) > 0.99
+
+
+def test_icp():
+    rng = np.random.RandomState(0)
+    yxz_base = rng.rand(200, 3) * np.array([100, 100, 10])
+    transform_true = np.eye(4, 3)
+    transform_true[3] = [1.5, -2, 0.5]
+    yxz_target = np.pad(yxz_base, [(0, 0), (0, 1)], constant_values=1) @ transform_true
+
+    transform, n_matches, error, converged = reg_base.icp(
+        yxz_base, yxz_target, dist_thresh_yx=5, dist_thresh_z=2, start_transform=np.eye(4, 3), n_iters=20
+    )
+    assert converged
+    assert np.allclose(transform, transform_true)
+    assert n_matches.shape == (20,)
+    assert error.shape == (20,)
+    assert n_matches[-1] == 200
+    assert np.isclose(error[-1], 0)
+
+    # A single iteration has nothing to compare against, so it is reported as converged.
+    _, _, _, converged = reg_base.icp(
+        yxz_base, yxz_target, dist_thresh_yx=5, dist_thresh_z=2, start_transform=np.eye(4, 3), n_iters=1
+    )
+    assert converged
+
+    # Warm start from the result, ICP then converges to the same transform.
+    start_transform = reg_base.get_icp_warm_start(np.eye(4, 3), transform, True, n_matches[-1], 100)
+    assert np.allclose(start_transform, 0.5 * (np.eye(4, 3) + transform_true))
+    transform_warm, _, _, converged = reg_base.icp(
+        yxz_base, yxz_target, dist_thresh_yx=5, dist_thresh_z=2, start_transform=start_transform, n_iters=20
+    )
+    assert converged
+    assert np.allclose(transform_warm, transform_true)
+
+
+def test_get_icp_warm_start():
+    start_transform = np.eye(4, 3)
+    previous_transform = np.eye(4, 3)
+    previous_transform[3] = [2, -4, 1]
+
+    warm_start = reg_base.get_icp_warm_start(start_transform, previous_transform, True, 100, 100)
+    assert np.allclose(warm_start[:3], np.eye(3))
+    assert np.allclose(warm_start[3], [1, -2, 0.5])
+    # No warm start without a previous result, an explicit convergence or enough matches.
+    assert reg_base.get_icp_warm_start(start_transform, None, True, 100, 100) is start_transform
+    assert reg_base.get_icp_warm_start(start_transform, previous_transform, False, 100, 100) is start_transform
+    assert reg_base.get_icp_warm_start(start_transform, previous_transform, True, 99, 100) is start_transform
+
+
+def test_subsample_spots():
+    yxz = np.arange(30).reshape((10, 3))
+    assert reg_base.subsample_spots(yxz, 10, (0, 1, 2)) is yxz
+    yxz_subset = reg_base.subsample_spots(yxz, 4, (0, 1, 2))
+    assert yxz_subset.shape == (4, 3)
+    assert np.isin(yxz_subset[:, 0], yxz[:, 0]).all()
+    assert (np.diff(yxz_subset[:, 0]) > 0).all()
+    assert np.array_equal(yxz_subset, reg_base.subsample_spots(yxz, 4, (0, 1, 2)))
@@ -2,6 +2,8 @@ import numpy as np
 from skimage import data
 
 from coppafisher.register import preprocessing as reg_pre
+from coppafisher.setup.config_section import ConfigSection
+from coppafisher.setup.notebook_page import NotebookPage
 
 
 def test_split_3d_image():
@@ -68,3 +70,70 @@ def test_merge_subvols():
     assert im_merged.shape == im.shape
     # Test that the values are correct
     assert np.allclose(im_merged, im)
+
+
+def test_save_load_reg_data(tmp_path):
+    nbp_file = NotebookPage("file_names")
+    nbp_file.output_dir = str(tmp_path)
+    nbp_file.fluorescent_bead_path = None
+    nbp_basic = NotebookPage("basic_info")
+    nbp_basic.n_tiles = 2
+    nbp_basic.n_rounds = 3
+    nbp_basic.n_extra_rounds = 1
+    nbp_basic.n_channels = 4
+    nbp_basic.channel_camera = np.array([470, 470, 525, 525])
+    nbp_basic.anchor_channel = 1
+    nbp_basic.use_channels = (0, 2, 3)
+    config = ConfigSection("register", {"bead_radii": (10, 11, 12)})
+    inputs = reg_pre.get_channel_registration_inputs(nbp_file, nbp_basic, config)
+
+    registration_data = reg_pre.load_reg_data(nbp_file, nbp_basic, inputs)
+    assert registration_data["channel_registration"]["transform"].shape == (4, 4, 3)
+    assert (registration_data["channel_registration"]["transform"] == 0).all()
+
+    registration_data["channel_registration"]["transform"][:] = np.eye(4, 3)
+    registration_data["channel_registration"].update(inputs)
+    registration_data["icp"] = {"converged_round": np.ones((2, 3), dtype=bool)}
+    reg_pre.save_reg_data(registration_data, nbp_file)
+    registration_data_loaded = reg_pre.load_reg_data(nbp_file, nbp_basic, inputs)
+
+    assert registration_data_loaded.keys() == registration_data.keys()
+    assert registration_data_loaded["round_registration"] == registration_data["round_registration"]
+    assert type(registration_data_loaded["round_registration"]["flow_dir"]) is str
+    assert np.array_equal(
+        registration_data_loaded["channel_registration"]["transform"],
+        registration_data["channel_registration"]["transform"],
+    )
+    assert registration_data_loaded["icp"]["converged_round"].dtype == bool
+    assert registration_data_loaded["icp"]["converged_round"].all()
+
+    # The saved channel registration is not reused once any of its inputs change.
+    changed_inputs = [
+        reg_pre.get_channel_registration_inputs(nbp_file, nbp_basic, ConfigSection("register", {"bead_radii": None}))
+    ]
+    del nbp_file.fluorescent_bead_path
+    nbp_file.fluorescent_bead_path = str(tmp_path / "beads.nd2")
+    changed_inputs.append(reg_pre.get_channel_registration_inputs(nbp_file, nbp_basic, config))
+    del nbp_file.fluorescent_bead_path
+    nbp_file.fluorescent_bead_path = None
+    del nbp_basic.channel_camera
+    nbp_basic.channel_camera = np.array([470, 525, 525, 525])
+    changed_inputs.append(reg_pre.get_channel_registration_inputs(nbp_file, nbp_basic, config))
+    for changed_input in changed_inputs:
+        registration_data_loaded = reg_pre.load_reg_data(nbp_file, nbp_basic, changed_input)
+        assert registration_data_loaded["channel_registration"].keys() == {"transform"}
+        assert (registration_data_loaded["channel_registration"]["transform"] == 0).all()
+
+
+def test_fill_to_uint8():
+    array = np.array([[-2, 0], [3, 8]], dtype=np.int16)
+    array_uint8 = reg_pre.fill_to_uint8(array)
+    assert array_uint8.dtype == np.uint8
+    assert array_uint8.shape == array.shape
+    assert array_uint8.min() == 0
+    assert array_uint8.max() == 255
+    assert array_uint8[0, 1] == 51
+
+    array_uint8 = reg_pre.fill_to_uint8(np.full((3, 4), 5.5))
+    assert array_uint8.dtype == np.uint8
+    assert (array_uint8 == 0).all()
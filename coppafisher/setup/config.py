@@ -218,6 +218,8 @@ class Config:
             "neighb_dist_thresh_z": ("maybe_number", "positive"),
             "icp_min_spots": ("int", "not-negative"),
             "icp_max_iter": ("int", "not-negative"),
+            "icp_error_tol": ("number", "not-negative"),
+            "icp_max_spots": ("int", "positive"),
         },
         "call_spots": {
             "background_subtract": ("bool", ""),
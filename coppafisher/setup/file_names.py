@@ -1,11 +1,36 @@
 import importlib.resources as importlib_resources
 import os
+from typing import Any
 
-from .. import utils
 from ..setup.config import Config
+from ..setup.config_section import ConfigSection
 from ..setup.notebook_page import NotebookPage
 from .tile_details import get_tile_file_names
 
+# Parsed file_names config section values, keyed by the config file's absolute path, modification time and size.
+_file_names_config_cache: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+
+def _load_file_names_config(config_path: str) -> ConfigSection:
+    """
+    Load the `file_names` config section. The config file is only parsed again when it has changed on disk since it
+    was last loaded.
+
+    Args:
+        config_path (str): file path to the config.
+
+    Returns:
+        (ConfigSection): config. A new `file_names` config section that is safe to modify.
+    """
+    config_stat = os.stat(config_path)
+    key = (os.path.abspath(config_path), config_stat.st_mtime_ns, config_stat.st_size)
+    if key not in _file_names_config_cache:
+        config = Config()
+        config.load(config_path, post_check=False)
+        _file_names_config_cache[key] = config["file_names"].to_dict()
+    # The formatted config values are immutable, so a shallow copy keeps the cached values unchanged.
+    return ConfigSection("file_names", dict(_file_names_config_cache[key]))
+
 
 def get_file_names(nbp_basic_info: NotebookPage, config_path: str) -> NotebookPage:
     """
@@ -23,9 +48,7 @@ def get_file_names(nbp_basic_info: NotebookPage, config_path: str) -> NotebookPa
     Returns:
         (NotebookPage): nbp_file. `file_names` notebook page.
     """
-    config = Config()
-    config.load(config_path, post_check=False)
-    config = config["file_names"]
+    config = _load_file_names_config(config_path)
     nbp = NotebookPage("file_names", {config.name: config.to_dict()})
     # Copy some variables that are in config to page.
     nbp.input_dir = config["input_dir"]
@@ -33,30 +56,29 @@ def get_file_names(nbp_basic_info: NotebookPage, config_path: str) -> NotebookPa
     nbp.extract_dir = os.path.join(config["tile_dir"], "extract")
     nbp.fluorescent_bead_path = config["fluorescent_bead_path"]
 
-    # FIXME: This is painful to look at.
     # Remove file extension from round and anchor file names if it is present.
     if config["raw_extension"] == "jobs":
-        all_files: list[str] = os.listdir(config["input_dir"])
-        all_files.sort()  # Sort files by ascending number
+        all_files = sorted(os.listdir(config["input_dir"]))  # Sort files by ascending number
         n_rounds = len(nbp_basic_info.use_rounds)
-        # FIXME: What is this magical number 8 here?
-        n_tiles = int(len(all_files) / (n_rounds * 8))
+        # Each imaging round, followed by the anchor round, has the same number of files: one for every tile and laser.
+        n_files_per_round = len(all_files) // (n_rounds + 1)
+        jobs_round_files = []
+        for r in range(n_rounds + 1):
+            r_files = all_files[n_files_per_round * r : n_files_per_round * (r + 1)]
+            jobs_round_files.append([file.removesuffix(".nd2") for file in r_files])
 
-        round = []
-        for r in range(n_rounds):
-            r_files = all_files[n_tiles * r * n_rounds : n_tiles * (r + 1) * n_rounds]
-            round.append([file.replace(".nd2", "") for file in r_files])
-
-        config["anchor"] = tuple([file.replace(".nd2", "") for file in all_files[n_tiles * n_rounds * n_rounds :]])
+        config["round"] = tuple(tuple(r_files) for r_files in jobs_round_files[:-1])
+        config["anchor"] = tuple(jobs_round_files[-1])
     else:
         if config["round"] is None:
             if config["anchor"] is None:
                 raise ValueError("Neither imaging rounds nor anchor_round provided")
             config["round"] = tuple()  # Sometimes the case where just want to run the anchor round.
-        config["round"] = tuple([r.replace(config["raw_extension"], "") for r in config["round"]])
+        raw_extension = config["raw_extension"]
+        config["round"] = tuple(r.removesuffix(raw_extension) for r in config["round"])
 
         if config["anchor"] is not None:
-            config["anchor"] = config["anchor"].replace(config["raw_extension"], "")
+            config["anchor"] = config["anchor"].removesuffix(raw_extension)
 
     nbp.round = config["round"]
     nbp.anchor = config["anchor"]
@@ -71,23 +93,21 @@ def get_file_names(nbp_basic_info: NotebookPage, config_path: str) -> NotebookPa
         config["psf"] = str(importlib_resources.files("coppafisher.setup").joinpath("default_psf.npz"))
     nbp.psf = config["psf"]
 
-    if config["anchor"] is not None:
-        round_files = config["round"] + (config["anchor"],)
-    else:
-        round_files = config["round"]
-
     if config["raw_extension"] == "jobs":
-        round_files = config["round"] + [config["anchor"]]
         _, tile_names_unfiltered = get_tile_file_names(
             "",
             nbp.extract_dir,
-            round_files,
+            jobs_round_files,
             nbp_basic_info.n_tiles,
             ".zarr",
             nbp_basic_info.n_channels,
             jobs=True,
         )
     else:
+        if config["anchor"] is not None:
+            round_files = config["round"] + (config["anchor"],)
+        else:
+            round_files = config["round"]
         _, tile_names_unfiltered = get_tile_file_names(
             "",
             nbp.extract_dir,
@@ -96,6 +116,7 @@ def get_file_names(nbp_basic_info: NotebookPage, config_path: str) -> NotebookPa
             ".zarr",
             nbp_basic_info.n_channels,
         )
-    nbp.tile_unfiltered = utils.base.deep_convert(tile_names_unfiltered.tolist())
+    # The (n_tiles, n_rounds, n_channels) file names are converted straight to nested tuples, as the page requires.
+    nbp.tile_unfiltered = tuple(tuple(map(tuple, tile_names)) for tile_names in tile_names_unfiltered.tolist())
 
     return nbp
@@ -29,13 +29,18 @@ class Notebook:
         "_config_path",
         "_init_config",
         "_directory",
+        "_metadata_path",
         "_time_created",
         "_version",
+        "_saved_page_names",
     )
     _debug_pages = ("debug", "debug_2")
 
     _config_path: Optional[str]
 
+    # The names of pages already written to the notebook directory by this instance or loaded from it.
+    _saved_page_names: set[str]
+
     def get_config_path(self) -> Optional[str]:
         return self._config_path
 
@@ -44,6 +49,9 @@ class Notebook:
     config_path: Optional[str] = property(get_config_path)
 
     _metadata_name = "_metadata.json"
+    # Suffix of the temporary directory a page is written into before being moved into place.
+    _temp_page_suffix = ".tmp"
+    _metadata_path: str
 
     _time_created: float
     _time_created_key = "time_created"
@@ -114,8 +122,10 @@ class Notebook:
         if config_path is not None:
             self._config_path = os.path.abspath(config_path)
         self._directory = os.path.abspath(notebook_dir)
+        self._metadata_path = os.path.join(self._directory, self._metadata_name)
         self._time_created = time.time()
         self._version = utils_system.get_software_version()
+        self._saved_page_names = set()
         if not os.path.isdir(self._directory):
             if self._config_path is None:
                 raise ValueError("To create a new notebook, config_path must be specified")
@@ -141,12 +151,15 @@ class Notebook:
                 + f"Variable(s) unset: {', '.join(unset_variables)}"
             )
 
-        if page.name not in self._debug_pages and len(self._get_modified_config_variables()) > 0:
-            log.warn(
-                f"The config at {self.config_path} has modified variable(s): "
-                + ", ".join(self._get_modified_config_variables())
-                + " since the pipeline was first started. Continue at your own risk."
-            )
+        if page.name not in self._debug_pages:
+            # The config on disk is parsed once to find any modified variables.
+            modified_variables = self._get_modified_config_variables()
+            if len(modified_variables) > 0:
+                log.warn(
+                    f"The config at {self.config_path} has modified variable(s): "
+                    + ", ".join(modified_variables)
+                    + " since the pipeline was first started. Continue at your own risk."
+                )
         self.__setattr__(page.name, page)
         self._save()
         return self
@@ -171,11 +184,8 @@ class Notebook:
         if page_name not in self._options.keys():
             raise ValueError(f"Not a real page name: {page_name}. Expected one of {', '.join(self._options.keys())}")
 
-        try:
-            self.__getattribute__(page_name)
-            return True
-        except AttributeError:
-            return False
+        # Pages are stored as instance attributes.
+        return page_name in self.__dict__
 
     def delete_page(self, page_name: str, prompt: bool = True) -> None:
         """
@@ -202,6 +212,7 @@ class Notebook:
         page_name_directory = self._get_page_directory(page_name)
         page: NotebookPage = self.__getattribute__(page_name)
         self.__delattr__(page_name)
+        self._saved_page_names.discard(page_name)
         page.close_stores()
         shutil.rmtree(page_name_directory)
         print(f"{page_name} deleted")
@@ -214,18 +225,20 @@ class Notebook:
         # to manually change variables that are already saved to disk. Even then, this function should be used as
         # little as possible as it will inevitably cause bugs.
         start_time = time.time()
+        metadata_path = self._get_metadata_path()
+        added_page_names = self._get_added_page_names()
         for filename in os.listdir(self._directory):
             filepath = os.path.join(self._directory, filename)
-            if os.path.isfile(filepath) and filepath != self._get_metadata_path():
+            if os.path.isfile(filepath) and filepath != metadata_path:
                 raise SystemError(f"Unexpected file called {filename} found in {self._directory}")
             if os.path.isdir(filepath) and filename not in self._options:
                 raise SystemError(f"Unexpected directory called {filename} found in {self._directory}")
             if os.path.isdir(filepath):
-                if filename in self._get_added_page_names():
+                if filename in added_page_names:
                     self.__getattribute__(filename).resave(filepath)
                 else:
                     shutil.rmtree(filepath)
-        os.remove(self._get_metadata_path())
+        os.remove(metadata_path)
         self._save_metadata()
         end_time = time.time()
         print(f"Notebook re-saved in {end_time - start_time:.2f}s")
@@ -272,6 +285,8 @@ class Notebook:
         if self.has_page(value.name):
             raise ValueError(f"Notebook already contains page named {value.name}")
 
+        # A newly set page has not been saved yet, even if a page of the same name was deleted from memory before.
+        self._saved_page_names.discard(name)
         object.__setattr__(self, name, value)
 
     def __gt__(self, page_name: str) -> None:
@@ -298,39 +313,59 @@ class Notebook:
         start_time = time.time()
         self._save_metadata()
         for page in self._get_added_pages():
+            # Only newly added pages are written, every other page is already on disk.
+            if page.name in self._saved_page_names:
+                continue
             page_dir = self._get_page_directory(page.name)
-            page.save(page_dir)
+            if not os.path.isdir(page_dir):
+                # The page is written to a temporary directory and only moved into place once complete, so an
+                # interrupted save never leaves behind a partial page that would be loaded as if it were saved.
+                temp_page_dir = page_dir + self._temp_page_suffix
+                if os.path.isdir(temp_page_dir):
+                    raise self._get_incomplete_save_error(temp_page_dir)
+                page.save(temp_page_dir)
+                page.close_stores()
+                os.replace(temp_page_dir, page_dir)
+                # Saved zarr variables are opened from inside the temporary directory, so re-open them at the page.
+                page.reopen_zarr_variables(page_dir)
+            self._saved_page_names.add(page.name)
         end_time = time.time()
         log.info(f"Notebook saved in {end_time - start_time:.2f}s")
 
     def _load(self) -> None:
         self._load_metadata()
-        # Check directory for existing notebook pages and load them in.
-        for page_name in os.listdir(self._directory):
-            if page_name == self._metadata_name:
-                continue
-            page_path = self._get_page_directory(page_name)
-            if os.path.isfile(page_path):
+        # Check directory for existing notebook pages and load them in. The scandir entries carry their file type, so
+        # no extra stat is needed per page.
+        with os.scandir(self._directory) as entries:
+            page_entries = [entry for entry in entries if entry.name != self._metadata_name]
+        for entry in page_entries:
+            page_name, page_path = entry.name, entry.path
+            if entry.is_dir() and page_name.endswith(self._temp_page_suffix):
+                raise self._get_incomplete_save_error(page_path)
+            if entry.is_file():
                 raise FileExistsError(f"Unexpected file {page_path} inside the notebook")
             if page_name not in self._options.keys():
                 raise IsADirectoryError(f"Unexpected directory at {page_path} inside the notebook")
             loaded_page = NotebookPage(page_name)
             loaded_page.load(page_path)
             self.__setattr__(page_name, loaded_page)
+            self._saved_page_names.add(page_name)
+
+    def _get_incomplete_save_error(self, temp_page_dir: str) -> SystemError:
+        # Saved zarr variables are moved into the temporary page directory, so it can hold the only copy of them.
+        return SystemError(
+            f"Found an incomplete notebook page save at {temp_page_dir}. It may contain the only copy of some of the "
+            + "page's zarr variables. Move anything you want to keep out of it, then delete the directory."
+        )
 
     def _get_added_pages(self) -> Tuple[NotebookPage, ...]:
-        pages = []
-        for page_name in self._options.keys():
-            if self.has_page(page_name):
-                pages.append(self.__getattribute__(page_name))
-        return tuple(pages)
+        # Pages are stored as instance attributes, so they are looked up directly in the instance dictionary instead
+        # of catching an AttributeError for every page that is not added.
+        instance_dict = self.__dict__
+        return tuple(instance_dict[page_name] for page_name in self._options if page_name in instance_dict)
 
     def _get_added_page_names(self) -> Tuple[str, ...]:
-        pages = self._get_added_pages()
-        names = []
-        for page in pages:
-            names.append(page.name)
-        return tuple(names)
+        return tuple(page_name for page_name in self._options if page_name in self.__dict__)
 
     def _get_page_directory(self, page_name: str) -> str:
         assert type(page_name) is str
@@ -340,7 +375,7 @@ class Notebook:
     def _get_modified_config_variables(self) -> Tuple[str, ...]:
         assert self.config_path is not None
 
-        modified_variables = tuple()
+        modified_variables = []
         msg_prefix = f"Config at {self.config_path} is missing"
         msg_suffix = (
             "Is the notebook from a different software version? If you are unsure, it "
@@ -355,53 +390,54 @@ class Notebook:
                     log.warn(f"{msg_prefix} section {config_section}. {msg_suffix}")
                     continue
                 for var_name, value in page.associated_configs[config_section].items():
-                    is_equal = False
                     if var_name not in config_on_disk[config_section].get_parameter_names():
                         log.warn(f"{msg_prefix} variable named {var_name} in section {config_section}. {msg_suffix}")
-                        modified_variables += (var_name,)
+                        modified_variables.append(var_name)
                         continue
                     config_variable = config_on_disk[config_section][var_name]
-                    if value == config_variable:
-                        is_equal = True
-                    if type(value) is list:
+                    # Saved tuples are loaded back as lists, so only lists need an element-wise comparison.
+                    if type(value) is not list:
+                        is_equal = value == config_variable
+                    else:
                         array_0 = np.array(value)
                         array_1 = np.array(config_variable)
-                        # This is dumb. But, it works.
-                        if isinstance(array_0.dtype.type(), (str, np.str_)):
-                            is_equal = (array_0 == array_1).all()
+                        if array_0.shape != array_1.shape:
+                            is_equal = False
+                        # String, bytes and object arrays are compared exactly, numeric arrays within a tolerance.
+                        elif array_0.dtype.kind in "USO":
+                            is_equal = np.array_equal(array_0, array_1)
                         else:
                             is_equal = np.allclose(array_0, array_1)
                     if not is_equal:
-                        modified_variables += (var_name,)
-        return modified_variables
+                        modified_variables.append(var_name)
+        return tuple(modified_variables)
 
     def _save_metadata(self) -> None:
-        assert os.path.isdir(self._directory)
-
-        file_path = self._get_metadata_path()
-        if os.path.isfile(file_path):
-            return
         metadata = {
             self._time_created_key: self._time_created,
             self._version_key: self._version,
         }
-        with open(file_path, "x") as file:
-            file.write(json.dumps(metadata, indent=4))
+        # Exclusive creation fails if the metadata is already saved, so no separate existence check is needed.
+        try:
+            with open(self._get_metadata_path(), "x") as file:
+                file.write(json.dumps(metadata, indent=4))
+        except FileExistsError:
+            return
 
     def _load_metadata(self) -> None:
         assert os.path.isdir(self._directory)
         file_path = self._get_metadata_path()
-        if not os.path.isfile(file_path):
-            raise FileNotFoundError(f"Could not find notebook metadata at {file_path}")
-
-        metadata = dict()
-        with open(file_path, "r") as file:
-            metadata = json.loads(file.read())
+        # Open the metadata directly rather than checking it exists first, so it is found and read in one go.
+        try:
+            with open(file_path, "r") as file:
+                metadata = json.load(file)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Could not find notebook metadata at {file_path}") from e
         self._version = metadata[self._version_key]
         self._time_created = metadata[self._time_created_key]
 
     def _get_metadata_path(self) -> str:
-        return os.path.join(self._directory, self._metadata_name)
+        return self._metadata_path
 
     def _get_page_names_after_page(self, page_name: str) -> tuple[str, ...]:
         """
@@ -218,12 +218,14 @@ class NotebookPage:
                 "Where extract, unfiltered image files are saved",
             ],
             "round": [
-                "tuple[file]",
-                "n_rounds names of *nd2* files for the imaging rounds. If not using, will be an empty list.",
+                "tuple[file] or tuple[tuple[file]]",
+                "n_rounds names of *nd2* files for the imaging rounds. If not using, will be an empty list. "
+                + "For JOBs data, `round[r]` is a tuple of every *nd2* file name in round `r`.",
             ],
             "anchor": [
-                "str or none",
-                "Name of *nd2* file for the anchor round. `none` if anchor not used",
+                "str or tuple[file] or none",
+                "Name of *nd2* file for the anchor round. `none` if anchor not used. For JOBs data, a tuple of every "
+                + "*nd2* file name in the anchor round.",
             ],
             "raw_extension": [
                 "str",
@@ -685,7 +687,7 @@ class NotebookPage:
         if len(self.get_unset_variables()) > 0:
             raise ValueError(
                 f"Cannot save unfinished page {self._name}. "
-                + f"Variable(s) {self._get_unset_variables()} not assigned yet."
+                + f"Variable(s) {self.get_unset_variables()} not assigned yet."
             )
 
         os.mkdir(page_directory)
@@ -714,6 +716,20 @@ class NotebookPage:
         if self.get_unzipped_variables():
             print(f"The notebook page {self.name} contains unzipped variables. You can now zip them by nb.zip()")
 
+    def reopen_zarr_variables(self, page_directory: str, /) -> None:
+        """
+        Re-open every zarr Array/Group variable from inside the given directory. This is used after the saved page
+        directory is moved. Every other variable is already in memory, so it is not read again.
+        """
+        if not os.path.isdir(page_directory):
+            raise FileNotFoundError(f"Could not find page directory at {page_directory} to load from")
+
+        self.close_stores()
+        for name, description in self._get_variables().items():
+            suffix = self._type_str_to_suffix(description[0].split(self._datatype_separator)[0])
+            if suffix in (".zarray", ".zgroup", ".zip", ".ziparray"):
+                self.__setattr__(name, self._load_variable(name, page_directory))
+
     def zip(self, page_directory: str, temp_directory: str, /) -> None:
         """
         Zip any zarr Arrays/Groups if not already.
@@ -743,13 +759,9 @@ class NotebookPage:
         """
         Return a tuple of all variable names that have not been set to a valid value in the notebook page.
         """
-        unset_variables = []
-        for variable_name in self._get_variables().keys():
-            try:
-                self.__getattribute__(variable_name)
-            except AttributeError:
-                unset_variables.append(variable_name)
-        return tuple(unset_variables)
+        # Variables are stored as instance attributes. Checking the instance dictionary avoids __getattribute__, which
+        # copies every set array variable.
+        return tuple(name for name in self._get_variables() if name not in self.__dict__)
 
     def get_unzipped_variables(self) -> Tuple[str]:
         """
@@ -902,13 +914,13 @@ class NotebookPage:
             file.write(json.dumps(metadata, indent=4))
 
     def _load_metadata(self, file_path: str) -> None:
-        if not os.path.isfile(file_path):
-            raise FileNotFoundError(f"Metadata file at {file_path} not found")
-
         metadata: dict[str, Any] = {}
-        with open(file_path, "r") as file:
-            metadata = json.loads(file.read())
-            assert type(metadata) is dict
+        try:
+            with open(file_path, "r") as file:
+                metadata = json.load(file)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Metadata file at {file_path} not found") from e
+        assert type(metadata) is dict
         self._name = metadata[self._page_name_key]
         self._time_created = metadata[self._time_created_key]
         self._version = metadata[self._version_key]
@@ -974,7 +986,7 @@ class NotebookPage:
 
         if file_suffix == ".json":
             with open(file_path, "r") as file:
-                value = json.loads(file.read())["value"]
+                value = json.load(file)["value"]
                 # A JSON file does not support saving tuples, they must be converted back to tuples here.
                 if type(value) is list:
                     value = utils_base.deep_convert(value)
@@ -11,7 +11,7 @@ def test_Config() -> None:
     assert Config.get_default_for("file_names", "notebook_name") == "notebook"
 
     config = Config()
-    config.options.clear()
+    config.options = {}
     config.options["debug"] = {
         "1": ("int", ""),
         "2": ("number", ""),
@@ -135,7 +135,7 @@ def test_Config() -> None:
 
     # Create a correct config file and ensure the formatted values are all correct.
     config = Config()
-    config.options.clear()
+    config.options = {}
     config.options["debug"] = {
         "1": ("int", ""),
         "2": ("number", ""),
@@ -224,7 +224,7 @@ def test_Config() -> None:
 
     # Check the post-checkers are working.
     config = Config()
-    config.options.clear()
+    config.options = {}
     config.options["debug"] = {
         "1": ("int", "positive"),
         "2": ("int", "negative"),
@@ -0,0 +1,54 @@
+import os
+
+from coppafisher.setup.file_names import get_file_names
+from coppafisher.setup.notebook_page import NotebookPage
+
+
+def test_get_file_names_jobs(tmp_path) -> None:
+    n_rounds = 2
+    n_tiles = 2
+    n_lasers = 7
+    n_channels = 9
+    input_dir = str(tmp_path / "input")
+    tile_dir = str(tmp_path / "tiles")
+    os.mkdir(input_dir)
+    os.mkdir(tile_dir)
+    # Every imaging round, followed by the anchor round, has one file for each tile and laser.
+    n_files = (n_rounds + 1) * n_tiles * n_lasers
+    for i in range(n_files):
+        with open(os.path.join(input_dir, f"{i:03d}.nd2"), "w"):
+            pass
+    config_path = str(tmp_path / "config.ini")
+    with open(config_path, "w") as config_file:
+        config_file.write(
+            "[file_names]\n"
+            + f"input_dir = {input_dir}\n"
+            + f"output_dir = {tmp_path}\n"
+            + f"tile_dir = {tile_dir}\n"
+            + "raw_extension = jobs\n"
+            + "code_book = codebook.txt\n"
+            + "\n[stitch]\n"
+            + "expected_overlap = 0.1\n"
+        )
+    nbp_basic = NotebookPage("basic_info")
+    nbp_basic.use_rounds = tuple(range(n_rounds))
+    nbp_basic.n_tiles = n_tiles
+    nbp_basic.n_channels = n_channels
+
+    nbp_file = get_file_names(nbp_basic, config_path)
+
+    n_files_per_round = n_tiles * n_lasers
+    assert nbp_file.raw_extension == "jobs"
+    assert len(nbp_file.round) == n_rounds
+    for r in range(n_rounds):
+        expected = [f"{i:03d}" for i in range(r * n_files_per_round, (r + 1) * n_files_per_round)]
+        assert nbp_file.round[r] == expected
+    assert nbp_file.anchor == [f"{i:03d}" for i in range(n_rounds * n_files_per_round, n_files)]
+    assert len(nbp_file.tile_unfiltered) == n_tiles
+    for t in range(n_tiles):
+        assert len(nbp_file.tile_unfiltered[t]) == n_rounds + 1
+        for r in range(n_rounds + 1):
+            assert len(nbp_file.tile_unfiltered[t][r]) == n_channels
+            # Channels 0-3 are in the tile's first laser file, channels 4-7 in the second and so on.
+            raw_file = f"{r * n_files_per_round + t * n_lasers + 1:03d}"
+            assert nbp_file.tile_unfiltered[t][r][5] == os.path.join(tile_dir, "extract", f"{raw_file}_t{t}c5.zarr")
@@ -279,6 +279,19 @@ def test_Notebook() -> None:
     nb = Notebook(nb_path)
     assert not nb.has_page("debug")
     assert not os.path.exists(os.path.join(nb_path, "debug"))
+    del nb
+
+    # An interrupted page save must not be deleted when the notebook is opened, it can hold the only copy of zarr data.
+    incomplete_page_path = os.path.join(nb_path, "debug.tmp")
+    os.mkdir(incomplete_page_path)
+    with open(os.path.join(incomplete_page_path, "o.zarray"), "w") as file:
+        file.write("")
+    try:
+        Notebook(nb_path)
+        raise AssertionError("Expected a SystemError when opening a notebook with an incomplete page save")
+    except SystemError:
+        pass
+    assert os.path.isfile(os.path.join(incomplete_page_path, "o.zarray"))
 
     # Clean any temporary files/directories.
     config_dir.cleanup()
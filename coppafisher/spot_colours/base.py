@@ -4,6 +4,8 @@ import numpy as np
 import torch
 import zarr
 
+from ..utils import system
+
 
 def convert_coords_to_torch_grid(yxz_coords: torch.Tensor, image_shape: tuple[int, int, int]) -> torch.Tensor:
     """
@@ -28,25 +30,25 @@ def convert_coords_to_torch_grid(yxz_coords: torch.Tensor, image_shape: tuple[in
     assert all([type(length) is int and length > 0 for length in image_shape])
 
     ndim = yxz_coords.ndim
-    # The spacing between two pytorch grid positions that should be 1 pixel separation in yxz coordinate space for each
+    # The grid_sample function places z coordinate at index 0 and y at the last index, so the grid is built in z, x, y
+    # order from the start.
+    zxy_shape = image_shape[::-1]
+    # The spacing between two pytorch grid positions that should be 1 pixel separation in zxy coordinate space for each
     # direction.
-    grid_step = 2 / (torch.tensor(image_shape).float() - 1)
+    grid_step = 2 / (torch.tensor(zxy_shape).float() - 1)
     grid_step = grid_step.reshape((1,) * (ndim - 1) + (3,))
-    yxz_grid = yxz_coords.detach().clone().float()
-    yxz_grid *= grid_step
-    yxz_grid -= 1
+    zxy_grid = yxz_coords.detach().flip(-1).float()
+    zxy_grid *= grid_step
+    zxy_grid -= 1
     # Edge case when the image_shape has single pixel dimension(s). All coordinates within said single pixel are set
     # to 0. Otherwise, they are set to -2 so they are out of bounds.
-    is_single_pixel_dimension = torch.tensor(image_shape) == 1
-    for i in range(3):
-        if is_single_pixel_dimension[i]:
-            is_within_bound = torch.isclose(yxz_coords[..., i], torch.zeros(1).float())
-            yxz_grid[..., i][is_within_bound] = 0
-            yxz_grid[..., i][torch.logical_not(is_within_bound)] = -2
+    is_single_pixel_dimension = torch.tensor(zxy_shape) == 1
+    if is_single_pixel_dimension.any():
+        is_within_bound = torch.isclose(yxz_coords.detach().flip(-1).float(), torch.zeros(1))
+        single_pixel_grid = torch.where(is_within_bound, 0.0, -2.0)
+        zxy_grid = torch.where(is_single_pixel_dimension, single_pixel_grid, zxy_grid)
 
-    # The grid_sample function places z coordinate at index 0 and y at the last index.
-    yxz_grid = yxz_grid[..., [2, 1, 0]]
-    return yxz_grid
+    return zxy_grid
 
 
 def apply_flow_new(
@@ -88,8 +90,9 @@ def apply_flow_new(
     assert r >= 0 and r < flow.shape[1], f"Got round {r}, expected r >= 0 and r < {flow.shape[1]}"
     yxz_torch = yxz
     if type(yxz) is np.ndarray:
-        yxz_torch = torch.tensor(yxz_torch)
-    yxz_torch = yxz_torch.detach().clone().float()
+        yxz_torch = torch.from_numpy(yxz_torch)
+    # A single copy as yxz_torch is shifted in place below.
+    yxz_torch = yxz_torch.detach().to(torch.float32, copy=True)
     if yxz_torch.size(0) == 0:
         return yxz_torch
     yxz_min, yxz_max = yxz_torch.min(0).values, yxz_torch.max(0).values
@@ -104,7 +107,8 @@ def apply_flow_new(
     assert flow_torch.ndim == 4, f"{flow_torch.ndim}"
     assert flow_torch.shape[0] == 3
 
-    yxz_torch -= torch.tensor(yxz_min)[None]
+    yxz_offset = torch.tensor(yxz_min, dtype=torch.float32)[None]
+    yxz_torch -= yxz_offset
     yxz_grid = convert_coords_to_torch_grid(yxz_torch, subset_tile_shape)
     # Input has shape (3, 1, flow.shape[0], flow.shape[1], flow.shape[2]).
     # Grid has shape (3 (repeated thrice), 1, 1, n_points, 3)
@@ -114,7 +118,7 @@ def apply_flow_new(
     flow_shifts = torch.nn.functional.grid_sample(flow_torch, yxz_grid, align_corners=True, padding_mode="border")
     flow_shifts = flow_shifts[:, 0, 0, 0]
     flow_shifts *= flow_multiplier
-    yxz_torch += flow_shifts.T + torch.tensor(yxz_min)[None]
+    yxz_torch += flow_shifts.T + yxz_offset
 
     if type(yxz) is np.ndarray:
         yxz_torch = yxz_torch.numpy()
@@ -138,9 +142,9 @@ def apply_affine(yxz: torch.Tensor, affine: torch.Tensor) -> torch.Tensor:
     assert yxz.shape[1] == 3
     assert type(affine) is torch.Tensor
     assert affine.shape == (4, 3)
-    # apply icp correction
-    yxz_transform = torch.cat([yxz, torch.ones(yxz.shape[0], 1)], dim=1).float()
-    yxz_transform = yxz_transform @ affine
+    # Apply the linear part then the shift, rather than padding yxz with a column of ones.
+    yxz_transform = yxz.float() @ affine[:3].float()
+    yxz_transform += affine[3].float()
     return yxz_transform
 
 
@@ -163,10 +167,9 @@ def get_spot_colours_new_safe(
     assert type(yxz) is np.ndarray or type(yxz) is torch.Tensor or yxz is None
     tile_shape = (nbp_basic_info.tile_sz, nbp_basic_info.tile_sz, len(nbp_basic_info.use_z))
     if yxz is None:
-        yxz = [np.linspace(0, tile_shape[i] - 1, tile_shape[i]) for i in range(3)]
-        yxz = np.array(np.meshgrid(*yxz, indexing="ij")).astype(np.int16).reshape((3, -1), order="F").T
+        yxz = np.indices(tile_shape, dtype=np.int16).reshape((3, -1), order="F").T
     if type(yxz) is np.ndarray:
-        yxz = torch.from_numpy(yxz).detach().clone()
+        yxz = torch.from_numpy(yxz)
     assert yxz.ndim == 2
     assert yxz.shape[1] == 3
 
@@ -198,6 +201,7 @@ def get_spot_colours_new(
     use_channels: list[int],
     output_dtype: np.dtype = np.float32,
     out_of_bounds_value: Any = np.nan,
+    force_cpu: bool = True,
 ) -> np.ndarray:
     """
     (Sub)pixel positions are gathered from the given image. First, the given yxz positions are optical flow shifted
@@ -216,6 +220,7 @@ def get_spot_colours_new(
         use_channels (list of ints): channel indices to use.
         output_dtype (np.dtype, optional): the returned spot colour datatype. Default: float32.
         out_of_bounds_value (any): what to value to set for out of bound spot colours. Default: np.nan.
+        force_cpu (bool, optional): only use the CPU to interpolate the image colours. Default: true.
 
     Returns:
         `(n_points x n_rounds x n_channels_use) ndarray[output_dtype]`: colours. Gathered image colours.
@@ -245,54 +250,55 @@ def get_spot_colours_new(
     assert len(use_channels) > 0
     assert all([type(c) is int for c in use_channels])
     assert all([c >= 0 and c < image.shape[2] for c in use_channels])
+    assert type(force_cpu) is bool
 
-    # TODO: GPU support.
+    device = system.get_device(force_cpu)
 
     # Prepare variables.
     tile_shape = tuple(image.shape[3:])
-    # Pytorch float32 tensors are used whilst computing.
+    # Pytorch float32 tensors are used whilst computing. Neither is modified in place, so numpy arrays are not copied.
     yxz_torch = yxz
     if type(yxz_torch) is np.ndarray:
-        yxz_torch = torch.tensor(yxz_torch)
-    yxz_torch = yxz_torch.detach().clone().float()
+        yxz_torch = torch.from_numpy(yxz_torch)
+    yxz_torch = yxz_torch.detach().float()
     affine_torch = affine
     if type(affine_torch) is np.ndarray:
-        affine_torch = torch.tensor(affine_torch)
-    affine_torch = affine_torch.detach().clone().float()
+        affine_torch = torch.from_numpy(affine_torch)
+    affine_torch = affine_torch.detach().float()
 
-    # TODO: Vectorise applying flow and affine transforms.
-    yxz_t = torch.full((len(use_rounds), len(use_channels), yxz.shape[0], 3), torch.nan, dtype=torch.float32)
+    # Every round is written below, so the positions are not initialised.
+    yxz_t = torch.empty((len(use_rounds), len(use_channels), yxz.shape[0], 3), dtype=torch.float32)
     for r_index, r in enumerate(use_rounds):
-        # image_tr = np.zeros((len(use_channels), 1) + tile_shape, np.float32)
-        yxz_tr = torch.zeros((len(use_channels), yxz.shape[0], 3), dtype=torch.float32)
         # First, apply round r optical flow to the given coordinates.
         yxz_r = apply_flow_new(yxz_torch, flow, tile, r)
-        for c_index, c in enumerate(use_channels):
-            # For each channel, apply the affine transform to the optical flow shifted yxz coordinates.
-            yxz_trc = apply_affine(yxz_r, affine_torch[tile, r, c])
-            yxz_tr[c_index] = yxz_trc
-            del yxz_trc
-        del yxz_r
-
-        yxz_t[r_index] = yxz_tr
-        del yxz_tr
+        # Then apply every channel's affine transform to the optical flow shifted yxz coordinates at once.
+        affine_r = affine_torch[tile, r, use_channels]
+        yxz_t[r_index] = torch.einsum("ni,cij->cnj", yxz_r, affine_r[:, :3]) + affine_r[:, 3, None]
+        del yxz_r, affine_r
 
     # Gather the smallest sized cuboid of filter image data to bilinear-interpolate all yxz_t coordinates.
     # This saves tons of disk read time and avoids memory crashing.
-    yxz_t_min = yxz_t.amin(dim=(0, 1, 2)).floor().clamp(torch.zeros(3), torch.tensor(tile_shape) - 1)
-    yxz_t_max = yxz_t.amax(dim=(0, 1, 2)).ceil().clamp(yxz_t_min, torch.tensor(tile_shape) - 1) + 1
+    # The bounds are found once over every round and channel, so one subset serves all the image reads.
+    tile_max = torch.tensor(tile_shape, dtype=torch.float32) - 1
+    yxz_t_min, yxz_t_max = torch.aminmax(yxz_t.reshape((-1, 3)), dim=0)
+    yxz_t_min = yxz_t_min.floor().clamp(torch.zeros(3), tile_max)
+    yxz_t_max = yxz_t_max.ceil().clamp(yxz_t_min, tile_max) + 1
     yxz_t_min = yxz_t_min.int().tolist()
     yxz_t_max = yxz_t_max.int().tolist()
     subset_tile_shape: tuple[int, int, int] = tuple([yxz_t_max[i] - yxz_t_min[i] for i in range(3)])
 
-    image_t = torch.zeros((len(use_rounds), len(use_channels), 1) + subset_tile_shape, dtype=torch.float32)
+    # Every element is overwritten by the image subset reads below.
+    image_t = torch.empty((len(use_rounds), len(use_channels), 1) + subset_tile_shape, dtype=torch.float32)
+    subset_slices = tuple(slice(yxz_t_min[i], yxz_t_max[i]) for i in range(3))
     for r_index, r in enumerate(use_rounds):
-        for c_index, c in enumerate(use_channels):
-            image_trc = image[
-                tile, r, c, yxz_t_min[0] : yxz_t_max[0], yxz_t_min[1] : yxz_t_max[1], yxz_t_min[2] : yxz_t_max[2]
-            ]
-            image_trc = torch.from_numpy(image_trc).float()
-            image_t[r_index, c_index, 0] = image_trc
+        # Read every channel for round r in one request.
+        selection = (tile, r, use_channels) + subset_slices
+        if type(image) is zarr.Array:
+            image_tr = image.get_orthogonal_selection(selection)
+        else:
+            image_tr = image[selection]
+        image_t[r_index, :, 0] = torch.from_numpy(image_tr).float()
+        del image_tr
 
     image_t = image_t.reshape((len(use_rounds) * len(use_channels), 1) + subset_tile_shape)
     yxz_t = yxz_t.reshape((len(use_rounds) * len(use_channels), 1, 1, yxz.shape[0], 3))
@@ -305,11 +311,13 @@ def get_spot_colours_new(
     # Input (image_tr) has shape (n_rounds * n_channels_use, 1, image.shape[0], image.shape[1], image.shape[2]).
     # Grid has shape (n_rounds * n_channels_use, 1, 1, n_points, 3)
     # Result has shape (n_rounds * n_channels_use, 1, 1, 1, n_points).
+    image_t = image_t.to(device)
+    grid_t = grid_t.to(device)
     colours = torch.nn.functional.grid_sample(image_t, grid_t, align_corners=True)
+    del image_t
 
     # Grid positions that are out of bounds are filled.
-    out_of_bounds = (grid_t < -1) | (grid_t > +1)
-    out_of_bounds = out_of_bounds.any(4)[:, np.newaxis]
+    out_of_bounds = (grid_t.abs().amax(4) > 1)[:, np.newaxis]
     colours[out_of_bounds] = out_of_bounds_value
     del out_of_bounds, grid_t
 
@@ -317,7 +325,7 @@ def get_spot_colours_new(
     # (n_rounds, n_channels_use, n_points) -> (n_points, n_rounds, n_channels_use).
     colours = colours.swapaxes(0, 2).swapaxes(1, 2)
 
-    colours = colours.numpy()
+    colours = colours.cpu().numpy()
     colours = colours.astype(output_dtype)
 
     return colours
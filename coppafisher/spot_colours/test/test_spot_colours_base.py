@@ -224,3 +224,10 @@ def test_get_spot_colours_new() -> None:
     assert np.isnan(colours[0, 0, :, :, 3:]).all()
     assert np.allclose(colours[2, 0, 0, 0, 0], image[tile, 2, 0, 0, 1:3, 0].mean(), atol=abs_tol)
     assert np.isnan(colours[2, 0, :, 3:]).all()
+
+    # The same colours are gathered when the GPU is allowed.
+    colours_gpu = spot_colours_base.get_spot_colours_new(
+        yxz, image, flow, affine, tile, use_rounds, use_channels, output_dtype=output_dtype, force_cpu=False
+    )
+    colours_gpu = colours_gpu.swapaxes(0, 1).swapaxes(1, 2).reshape((n_rounds, n_channels) + tile_shape, order="F")
+    assert np.allclose(colours_gpu, colours, atol=1e-6, equal_nan=True)
@@ -3,7 +3,6 @@ from collections.abc import Callable, Iterable
 from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
-import tqdm
 import zarr
 
 
@@ -59,7 +58,6 @@ def reed_solomon_codes(n_genes: int, n_rounds: int, n_dyes: Optional[int] = None
     assert n_genes > 0, "Require at least one gene"
     assert n_dyes < 10, "n_dyes >= 10 is not yet supported. Please raise an issue if required"
 
-    verbose = n_genes > 10
     degree = 0
     # Find the smallest degree polynomial required to produce `n_genes` unique gene codes. We use the smallest degree
     # polynomial because this will have the smallest amount of overlap between gene codes
@@ -71,36 +69,15 @@ def reed_solomon_codes(n_genes: int, n_rounds: int, n_dyes: Optional[int] = None
         if degree == 20:
             raise ValueError("Polynomial degree required is too large for generating the gene codes")
     # Create a `degree` degree polynomial, where each coefficient goes between (0, n_rounds] to generate each unique
-    # gene code
-    codes = dict()
-    # Index 0 is for constant, index 1 for linear coefficient, etc..
-    most_recent_coefficient_set = np.array(np.zeros(degree + 1))
-    for n_gene in tqdm.trange(n_genes, ascii=True, unit="Codes", desc="Generating gene codes", disable=not verbose):
-        # Find the next coefficient set that works, which is not just constant across all rounds (like a background
-        # code)
-        while True:
-            # Iterate to next working coefficient set, by mod n_dyes addition
-            most_recent_coefficient_set[0] += 1
-            for i in range(most_recent_coefficient_set.size):
-                if most_recent_coefficient_set[i] >= n_dyes:
-                    # Cycle back around to 0, then add one to next coefficient
-                    most_recent_coefficient_set[i] = 0
-                    most_recent_coefficient_set[i + 1] += 1
-            if np.all(most_recent_coefficient_set[1 : degree + 1] == 0):
-                continue
-            break
-        # Generate new gene code
-        new_code = ""
-        gene_name = f"gene_{n_gene}"
-        for r in range(n_rounds):
-            result = 0
-            for j in range(degree + 1):
-                result += most_recent_coefficient_set[j] * r**j
-            result = int(result)
-            result %= n_dyes
-            new_code += str(result)
-        # Add new code to dictionary
-        codes[gene_name] = new_code
+    # gene code. Each coefficient set is the base n_dyes digits of a counter, index 0 is for constant, index 1 for
+    # linear coefficient, etc.. Counters below n_dyes are skipped as their polynomial is just constant across all rounds
+    # (like a background code)
+    counters = n_dyes + np.arange(n_genes, dtype=np.int64)
+    coefficients = (counters[:, None] // n_dyes ** np.arange(degree + 1, dtype=np.int64)[None]) % n_dyes
+    # powers[r, j] is r**j mod n_dyes, so every gene's polynomial is evaluated on every round in one matrix product
+    powers = np.array([[pow(r, j, n_dyes) for j in range(degree + 1)] for r in range(n_rounds)], np.int64)
+    gene_codes = (coefficients @ powers.T) % n_dyes
+    codes = {f"gene_{g}": "".join(map(str, gene_code)) for g, gene_code in enumerate(gene_codes.tolist())}
     values = list(codes.values())
     if len(values) != len(set(values)):
         # Not every gene code is unique
@@ -1,8 +1,13 @@
 import itertools
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..setup.notebook_page import NotebookPage
 
+# Indices already created, keyed by the basic_info values and parameters that they depend on. The oldest entry is
+# removed once the cache is full.
+_max_cached_creates = 64
+_create_cache: Dict[Tuple[Any, ...], Tuple[Tuple[int, ...], ...]] = dict()
+
 
 def create(
     nbp_basic: NotebookPage,
@@ -15,7 +20,7 @@ def create(
     include_dapi_seq: bool = False,
     include_dapi_anchor: bool = False,
     include_bad_trc: bool = True,
-) -> List[Tuple[int, int, int]] | List[Tuple[int, int]] | List[Tuple[int]]:
+) -> Tuple[Tuple[int, int, int], ...] | Tuple[Tuple[int, int], ...] | Tuple[Tuple[int], ...]:
     """
     Create tile, round and/or channel indices to loops through. Used throughout the coppafisher pipeline. The defaults
     are set to return only sequencing rounds and channels. If something is set to be included which does not exist in
@@ -35,8 +40,9 @@ def create(
         include_bad_trc (bool, optional): include bad tile, round, channel combinations. Default: False.
 
     Returns:
-        list of tuple[int, int, int]] or list of tuple[int, int] or list of tuple[int] or list or tuple]: a list of
-            tuples, each tuple containing a unique tile, round and/or channel index.
+        tuple of tuple[int, int, int] or tuple of tuple[int, int] or tuple of tuple[int]: a sorted tuple of tuples,
+            each tuple containing a unique tile, round and/or channel index. It is immutable, so repeated calls with
+            the same notebook values and parameters share one result.
 
     Notes:
         - If `include_rounds` is false, then `include_channels` must also be false since the channel indices are
@@ -45,72 +51,113 @@ def create(
     if not include_rounds:
         assert not include_channels, "Unable to remove rounds and keep channels"
 
+    cache_key = (
+        tuple(nbp_basic.use_tiles),
+        tuple(nbp_basic.use_rounds),
+        tuple(nbp_basic.use_channels),
+        nbp_basic.use_anchor,
+        nbp_basic.anchor_round,
+        nbp_basic.anchor_channel,
+        nbp_basic.dapi_channel,
+        None if include_bad_trc else tuple(tuple(trc) for trc in nbp_basic.bad_trc),
+        include_rounds,
+        include_channels,
+        include_seq_rounds,
+        include_seq_channels,
+        include_anchor_round,
+        include_anchor_channel,
+        include_dapi_seq,
+        include_dapi_anchor,
+        include_bad_trc,
+    )
+    if cache_key in _create_cache:
+        return _create_cache[cache_key]
+
     seq_rounds = list(nbp_basic.use_rounds)
     seq_channels = list(nbp_basic.use_channels)
-    all_tiles = sorted([t for t in nbp_basic.use_tiles])
-    all_rounds = [
-        r
-        for r in include_seq_rounds * seq_rounds
-        + nbp_basic.use_anchor * include_anchor_round * [nbp_basic.anchor_round]
-    ]
-    all_rounds = sorted(all_rounds)
-    all_channels = [c for c in seq_channels]
+    all_tiles = sorted(nbp_basic.use_tiles)
+    all_rounds = sorted(
+        include_seq_rounds * seq_rounds + nbp_basic.use_anchor * include_anchor_round * [nbp_basic.anchor_round]
+    )
+    all_channels = seq_channels.copy()
     if (include_dapi_anchor or include_dapi_seq) and nbp_basic.dapi_channel is not None:
         all_channels += [nbp_basic.dapi_channel]
-    all_indices = []
-    # The indexed channels will change depending on the round and the parameters
-    for t, r in itertools.product(all_tiles, all_rounds):
-        for c in all_channels:
-            including = False
-            if r in seq_rounds:
-                if c in seq_channels and include_seq_channels:
-                    including = True
-                if c == nbp_basic.dapi_channel and include_dapi_seq:
-                    including = True
-            elif r == nbp_basic.anchor_round:
-                if c == nbp_basic.dapi_channel and include_dapi_anchor:
-                    including = True
-                if c == nbp_basic.anchor_channel and include_anchor_channel:
-                    including = True
-            if including:
-                all_indices.append((t, r, c))
-    output = []
-    for t, r, c in all_indices:
-        new_index = (t,)
-        if include_rounds:
-            new_index += (r,)
+    # The indexed channels will change depending on the round and the parameters, so they are found once per round.
+    dapi_channel = nbp_basic.dapi_channel
+    seq_round_channels = set()
+    if include_seq_channels:
+        seq_round_channels.update(seq_channels)
+    if include_dapi_seq:
+        seq_round_channels.add(dapi_channel)
+    anchor_round_channels = set()
+    if include_dapi_anchor:
+        anchor_round_channels.add(dapi_channel)
+    if include_anchor_channel:
+        anchor_round_channels.add(nbp_basic.anchor_channel)
+    seq_rounds_set = set(seq_rounds)
+    round_channels = dict()
+    for r in all_rounds:
+        if r in seq_rounds_set:
+            round_channels[r] = [c for c in all_channels if c in seq_round_channels]
+        elif r == nbp_basic.anchor_round:
+            round_channels[r] = [c for c in all_channels if c in anchor_round_channels]
+        else:
+            round_channels[r] = []
+    # The part of each index after the tile is decided once per round, so the final indices are emitted in one pass.
+    round_suffixes = dict()
+    for r, channels in round_channels.items():
         if include_channels:
-            new_index += (c,)
-        output.append(new_index)
-    # Remove any duplicate indices.
-    output = sorted(list(set(output)))
+            round_suffixes[r] = [(r, c) for c in channels]
+        elif include_rounds:
+            round_suffixes[r] = [(r,)] if channels else []
+        else:
+            round_suffixes[r] = [tuple()] if channels else []
+    # A set removes any duplicate indices as they are gathered.
+    output = set((t,) + suffix for t, r in itertools.product(all_tiles, all_rounds) for suffix in round_suffixes[r])
     if not include_bad_trc:
-        bad_trc = [tuple(trc) for trc in nbp_basic.bad_trc]
-        output = [index for index in output if index not in bad_trc]
+        output -= set(tuple(trc) for trc in nbp_basic.bad_trc)
+    output = tuple(sorted(output))
+    if len(_create_cache) >= _max_cached_creates:
+        del _create_cache[next(iter(_create_cache))]
+    _create_cache[cache_key] = output
     return output
 
 
-def find_channels_for(indices: List[Tuple[int, int, int]], tile: int, round: int) -> Tuple[int]:
+def find_channels_for(indices: Sequence[Tuple[int, int, int]], tile: int, round: int) -> Tuple[int]:
     """
     Gather a list of all unique channel indices with the given tile and round indices.
     """
-    assert isinstance(indices, list)
+    return group_channels(indices).get((tile, round), tuple())
+
+
+def group_channels(indices: Sequence[Tuple[int, int, int]]) -> Dict[Tuple[int, int], Tuple[int]]:
+    """
+    Gather all unique channel indices for every tile and round in one pass over indices. Use this over repeated calls
+    to `find_channels_for` when looking up many tile and round combinations.
+
+    Args:
+        indices (list or tuple of tuple[int, int, int]): tile, round and channel indices.
+
+    Returns:
+        dict[tuple[int, int], tuple[int]]: channels. channels[(t, r)] is the sorted, unique channel indices for tile t,
+            round r.
+    """
+    assert isinstance(indices, (list, tuple))
     assert len(indices[0]) == 3
 
-    channels = []
+    channels = dict()
     for t, r, c in indices:
-        if t == tile and round == r:
-            channels.append(c)
-    return tuple(set(channels))
+        channels.setdefault((t, r), set()).add(c)
+    return {tr: tuple(sorted(tr_channels)) for tr, tr_channels in channels.items()}
 
 
-def unique(indices: List[Tuple[Any]], axis: Optional[int] = None) -> List[Tuple[Any]]:
+def unique(indices: Sequence[Tuple[Any]], axis: Optional[int] = None) -> List[Tuple[Any]]:
     """
     Returns a list of indices that have a unique value in the `axis` index of the tuple. If a value in `axis` is seen
     multiple times in indices, then the one that appears first is taken.
 
     Args:
-        indices (list of tuple[any]): list of indices.
+        indices (list or tuple of tuple[any]): indices.
         axis (int, optional): axis in tuple to compare for uniqueness. Default: compute over all axes.
 
     Returns:
@@ -121,7 +168,7 @@ def unique(indices: List[Tuple[Any]], axis: Optional[int] = None) -> List[Tuple[
     if axis is not None:
         assert axis < len(indices[0]), "axis must be a dimension index in the tuples"
 
-    unique_values = []
+    unique_values = set()
     unique_indices = []
     for index in indices:
         if axis is None:
@@ -129,6 +176,6 @@ def unique(indices: List[Tuple[Any]], axis: Optional[int] = None) -> List[Tuple[
         else:
             value = index[axis]
         if value not in unique_values:
-            unique_values.append(value)
+            unique_values.add(value)
             unique_indices.append(index)
     return unique_indices
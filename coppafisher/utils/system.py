@@ -1,3 +1,4 @@
+import functools
 import os
 import shutil
 import subprocess
@@ -5,7 +6,6 @@ import sys
 from pathlib import PurePath
 from typing import Tuple
 
-import numpy as np
 import psutil
 import torch
 
@@ -43,12 +43,13 @@ def get_version_from_file(file_lines: list[str]) -> str:
     raise ValueError(f"No version found inside file:\n{file_lines}")
 
 
+@functools.lru_cache(maxsize=1)
 def get_software_version() -> str:
     """
     Get coppafisher's version tag as written in _version.py.
 
     If git CLI is installed, the short form commit hash is appended. This is found by the command `git describe
-    --always`. If this fails, then nothing is appended.
+    --always`. If this fails, then nothing is appended. The result is cached as it cannot change while running.
 
     Returns:
         (str): version. The local software version.
@@ -142,20 +143,24 @@ def get_device(force_cpu: bool) -> torch.device:
     return torch.device("cpu")
 
 
+@functools.lru_cache(maxsize=1)
 def get_core_count() -> int:
     """
-    Get the number of CPU cores available for multiprocessing tasks on the system.
+    Get the number of CPU cores available for multiprocessing tasks on the system. Where supported, only the cores this
+    process is allowed to run on are counted. The result is cached.
 
     Returns:
         (int): num_cores. The number of available CPU cores.
     """
-    n_threads = psutil.cpu_count(logical=True)
+    if hasattr(os, "sched_getaffinity"):
+        n_threads = len(os.sched_getaffinity(0))
+    else:
+        n_threads = psutil.cpu_count(logical=True)
     if n_threads is None:
         n_threads = 1
     else:
         n_threads -= 2
-    n_threads = np.clip(n_threads, 1, 999, dtype=int)
-    return int(n_threads)
+    return max(1, min(999, n_threads))
 
 
 def get_terminal_size_xy(x_offset: int = 0, y_offset: int = 0) -> Tuple[int, int]:
@@ -172,10 +177,7 @@ def get_terminal_size_xy(x_offset: int = 0, y_offset: int = 0) -> Tuple[int, int
         - (int): number of terminal rows.
     """
     terminal_size = tuple(shutil.get_terminal_size((80, 20)))
-    return (
-        int(np.clip(terminal_size[0] + x_offset, a_min=1, a_max=None)),
-        int(np.clip(terminal_size[1] + y_offset, a_min=1, a_max=None)),
-    )
+    return max(1, terminal_size[0] + x_offset), max(1, terminal_size[1] + y_offset)
 
 
 def is_path_on_mounted_server(path):
@@ -21,3 +21,5 @@ def test_reed_solomon_codes():
     for n_dyes, n_rounds in itertools.product(n_dyes_try, n_rounds_try):
         codes = base.reed_solomon_codes(4, n_rounds, n_dyes)
         assert len(codes) == len(set(codes)), "All Reed Solomon codes must be unique"
+    codes = base.reed_solomon_codes(4, 3, 3)
+    assert codes == {"gene_0": "012", "gene_1": "120", "gene_2": "201", "gene_3": "021"}
@@ -1,3 +1,7 @@
+import itertools
+from typing import List, Tuple
+
+from coppafisher.setup.notebook_page import NotebookPage
 from coppafisher.utils import indexing
 
 
@@ -8,3 +12,102 @@ def test_unique():
     assert indexing.unique([(0,), (0,), (1,)], 0) == [(0,), (1,)]
     assert indexing.unique([(1,), (1,), (1,)], 0) == [(1,)]
     assert indexing.unique([(0, 0), (1, 0), (2, 1)], 1) == [(0, 0), (2, 1)]
+
+
+def test_group_channels():
+    indices = [(0, 0, 2), (0, 0, 1), (0, 1, 1), (1, 0, 3), (0, 0, 2)]
+    assert indexing.group_channels(indices) == {(0, 0): (1, 2), (0, 1): (1,), (1, 0): (3,)}
+    assert indexing.find_channels_for(indices, 0, 0) == (1, 2)
+    assert indexing.find_channels_for(indices, 1, 1) == tuple()
+
+
+def _create_reference(nbp_basic: NotebookPage, include_flags: Tuple[bool, ...]) -> List[Tuple[int, ...]]:
+    # The original triple loop implementation of indexing.create.
+    (
+        include_rounds,
+        include_channels,
+        include_seq_rounds,
+        include_seq_channels,
+        include_anchor_round,
+        include_anchor_channel,
+        include_dapi_seq,
+        include_dapi_anchor,
+        include_bad_trc,
+    ) = include_flags
+    seq_rounds = list(nbp_basic.use_rounds)
+    seq_channels = list(nbp_basic.use_channels)
+    all_rounds = include_seq_rounds * seq_rounds
+    all_rounds += nbp_basic.use_anchor * include_anchor_round * [nbp_basic.anchor_round]
+    all_channels = list(seq_channels)
+    if (include_dapi_anchor or include_dapi_seq) and nbp_basic.dapi_channel is not None:
+        all_channels += [nbp_basic.dapi_channel]
+    output = []
+    for t, r in itertools.product(sorted(nbp_basic.use_tiles), sorted(all_rounds)):
+        for c in all_channels:
+            including = False
+            if r in seq_rounds:
+                if c in seq_channels and include_seq_channels:
+                    including = True
+                if c == nbp_basic.dapi_channel and include_dapi_seq:
+                    including = True
+            elif r == nbp_basic.anchor_round:
+                if c == nbp_basic.dapi_channel and include_dapi_anchor:
+                    including = True
+                if c == nbp_basic.anchor_channel and include_anchor_channel:
+                    including = True
+            if including:
+                output.append((t,) + include_rounds * (r,) + include_channels * (c,))
+    output = sorted(set(output))
+    if not include_bad_trc:
+        bad_trc = [tuple(trc) for trc in nbp_basic.bad_trc]
+        output = [index for index in output if index not in bad_trc]
+    return output
+
+
+def test_create():
+    nbp_basic = NotebookPage("basic_info")
+    nbp_basic.use_tiles = (2, 0)
+    nbp_basic.use_rounds = (0, 1)
+    nbp_basic.use_channels = (1, 3)
+    nbp_basic.use_anchor = True
+    nbp_basic.anchor_round = 2
+    nbp_basic.anchor_channel = 3
+    nbp_basic.dapi_channel = 0
+    nbp_basic.bad_trc = ((0, 1, 3), (2, 0, 1))
+
+    for include_flags in itertools.product((True, False), repeat=9):
+        include_rounds, include_channels = include_flags[:2]
+        if not include_rounds and include_channels:
+            continue
+        indices = indexing.create(nbp_basic, *include_flags)
+        assert type(indices) is tuple
+        assert list(indices) == _create_reference(nbp_basic, include_flags)
+        # The same notebook values and parameters reuse the cached result.
+        assert indexing.create(nbp_basic, *include_flags) is indices
+        assert len(indexing._create_cache) <= indexing._max_cached_creates
+
+    seq_indices = ((0, 0, 1), (0, 0, 3), (0, 1, 1), (0, 1, 3), (2, 0, 1), (2, 0, 3), (2, 1, 1), (2, 1, 3))
+    assert indexing.create(nbp_basic) == seq_indices
+    good_seq_indices = ((0, 0, 1), (0, 0, 3), (0, 1, 1), (2, 0, 3), (2, 1, 1), (2, 1, 3))
+    assert indexing.create(nbp_basic, include_bad_trc=False) == good_seq_indices
+    anchor_indices = indexing.create(
+        nbp_basic,
+        include_seq_rounds=False,
+        include_anchor_round=True,
+        include_anchor_channel=True,
+        include_dapi_anchor=True,
+    )
+    assert anchor_indices == ((0, 2, 0), (0, 2, 3), (2, 2, 0), (2, 2, 3))
+    assert indexing.create(nbp_basic, include_channels=False) == ((0, 0), (0, 1), (2, 0), (2, 1))
+    assert indexing.create(nbp_basic, include_rounds=False, include_channels=False) == ((0,), (2,))
+
+    # A changed notebook value is a cache miss.
+    del nbp_basic.use_tiles
+    nbp_basic.use_tiles = (1,)
+    assert indexing.create(nbp_basic, include_channels=False) == ((1, 0), (1, 1))
+    del nbp_basic.bad_trc
+    nbp_basic.bad_trc = tuple()
+    assert indexing.create(nbp_basic, include_bad_trc=False) == indexing.create(nbp_basic)
+    del nbp_basic.dapi_channel
+    nbp_basic.dapi_channel = None
+    assert indexing.create(nbp_basic, include_dapi_seq=True) == indexing.create(nbp_basic)